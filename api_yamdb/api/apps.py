@@ -1,7 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'API'
+
+    def ready(self):
+        from . import metrics, signals  # noqa: F401
+        connection_created.connect(
+            metrics.count_connection, dispatch_uid='api.metrics.connections'
+        )
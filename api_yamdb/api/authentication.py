@@ -0,0 +1,92 @@
+"""JWT-аутентификация без запроса пользователя к базе.
+
+TokenView выдаёт токен с ролью и флагами пользователя в claims.
+ClaimsJWTAuthentication собирает из них лёгкий ClaimsUser, которого
+достаточно для проверки прав. Если роль, флаги или активность
+пользователя поменялись после выдачи токена, время изменения
+хранится в кеше на срок жизни токена, и такой токен проверяется
+по базе. Токены без claims (выданные раньше) тоже проверяются
+по базе.
+
+Кеш изменений — алиас CLAIMS_CHANGED_CACHE — должен быть общим для
+всех воркеров (файловый, Redis): с локальным кешем изменение видно
+только своему процессу.
+"""
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+ISSUED_AT_CLAIM = 'iat'
+CLAIMS_CHANGED_KEY = 'auth:claims-changed:{}'
+
+
+def get_cache():
+    return caches[settings.CLAIMS_CHANGED_CACHE]
+
+
+def mark_claims_changed(user_id):
+    """Заставляет проверять по базе токены, выданные до этого момента."""
+    get_cache().set(
+        CLAIMS_CHANGED_KEY.format(user_id), time(),
+        settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+    )
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с ролью и флагами пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[ISSUED_AT_CLAIM] = int(time())
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из claims токена.
+    Права считаются так же, как у модели пользователя.
+    """
+
+    RoleChoices = User.RoleChoices
+    is_active = True
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, User)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Берёт пользователя из claims токена, а при их отсутствии
+    или после смены роли — из базы.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        issued_at = validated_token.get(ISSUED_AT_CLAIM)
+        if (user_id is None or issued_at is None
+                or any(claim not in validated_token for claim in CLAIMS)):
+            return super().get_user(validated_token)
+        changed_at = get_cache().get(CLAIMS_CHANGED_KEY.format(user_id))
+        if changed_at is not None and changed_at >= issued_at:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
@@ -0,0 +1,135 @@
+"""Инструменты замера производительности эндпоинтов API.
+
+Каждый сценарий готовит запрос (`prepare`) и выполняет его (`run`);
+замеряются задержка, число SQL-запросов и пик выделенной памяти.
+Отчёт сохраняется в JSON и может сравниваться с предыдущим запуском.
+"""
+import json
+import tracemalloc
+from contextlib import contextmanager
+from math import ceil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+# Метрики отчёта. Задержки и память шумят, поэтому сравниваются
+# с допуском; число запросов должно совпадать точно.
+REPORT_METRICS = ('p50_ms', 'p95_ms', 'queries', 'memory_kb')
+LATENCY_METRICS = ('p50_ms', 'p95_ms')
+EXACT_METRICS = ('queries',)
+WARMUP_REQUESTS = 3
+
+
+FILE_CACHE_BACKEND = 'django.core.cache.backends.filebased.FileBasedCache'
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@contextmanager
+def isolated_storage():
+    """Подменяет кеши и счётчики троттлинга на время замера.
+    Файловые кеши и THROTTLE_DB_PATH общие с сервером, работающим
+    на этой машине, поэтому переносятся во временный каталог, а внешние
+    кеши (Redis) заменяются памятью процесса. Так сброс лимитов между
+    сценариями не обнуляет лимиты живого сервера.
+    """
+    with TemporaryDirectory() as directory:
+        cache_settings = {
+            alias: {**config, 'LOCATION': str(Path(directory) / alias)}
+            if config['BACKEND'] == FILE_CACHE_BACKEND
+            else {'BACKEND': LOCAL_CACHE_BACKEND,
+                  'LOCATION': f'benchmark-{alias}'}
+            for alias, config in settings.CACHES.items()
+        }
+        with override_settings(
+            CACHES=cache_settings,
+            THROTTLE_DB_PATH=Path(directory) / 'throttle.sqlite3'
+        ):
+            yield
+
+
+class Scenario:
+    """Сценарий замера одного маршрута."""
+
+    def __init__(self, name, run, prepare=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(scenario, repeat, warmup=WARMUP_REQUESTS):
+    """Выполняет сценарий repeat раз и возвращает метрики.
+    Первые warmup запросов прогревают кеши и не учитываются.
+    Память замеряется отдельным прогоном, чтобы tracemalloc
+    не искажал задержки.
+    """
+    for _ in range(warmup):
+        scenario.run(*(scenario.prepare() if scenario.prepare else ()))
+    latencies, queries, statuses = [], [], set()
+    for _ in range(repeat):
+        args = scenario.prepare() if scenario.prepare else ()
+        with CaptureQueriesContext(connection) as captured:
+            started = perf_counter()
+            response = scenario.run(*args)
+            latencies.append((perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+
+    args = scenario.prepare() if scenario.prepare else ()
+    tracemalloc.start()
+    try:
+        scenario.run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'queries': max(queries),
+        'memory_kb': round(peak / 1024, 1),
+        'statuses': sorted(statuses),
+        'requests': repeat,
+    }
+
+
+def compare_reports(baseline, current, threshold, min_delta_ms=0):
+    """Возвращает список регрессий текущего отчёта относительно базового.
+    Регрессия — рост метрики больше чем на threshold (доля),
+    для числа запросов — любой рост. Рост задержки меньше min_delta_ms
+    считается шумом.
+    """
+    regressions = []
+    for name, old in baseline['routes'].items():
+        new = current['routes'].get(name)
+        if new is None:
+            continue
+        for metric in REPORT_METRICS:
+            allowed = old[metric] * (
+                1 if metric in EXACT_METRICS else 1 + threshold
+            )
+            if metric in LATENCY_METRICS:
+                allowed = max(allowed, old[metric] + min_delta_ms)
+            if new[metric] > allowed:
+                regressions.append((name, metric, old[metric], new[metric]))
+    return regressions
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2)
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)
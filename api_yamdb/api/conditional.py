@@ -0,0 +1,125 @@
+"""Условные GET-запросы: ETag, Last-Modified и ответ 304.
+
+ETag считается по версиям строк (полю updated_at), которые viewset
+и так загружает для ответа, а не по готовому телу: объект или
+страница выбираются из базы, и если клиент прислал совпадающий
+If-None-Match, ответ 304 отдаётся до работы сериализаторов.
+
+Для списка в ETag входят pk и версии строк страницы и служебная
+часть ответа пагинации (count, next, previous), поэтому удаление
+записи на другой странице тоже меняет ETag. Last-Modified отдаётся
+только для отдельного объекта: у списка удаление строки не меняет
+максимальной даты изменения.
+"""
+from hashlib import md5
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import parse_etags
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+
+RESULTS_KEY = 'results'
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """Проверяет If-None-Match, а без него — If-Modified-Since."""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        # Для GET сравнение слабое: W/"x" совпадает с "x".
+        etags = {
+            tag[2:] if tag.startswith('W/') else tag
+            for tag in parse_etags(if_none_match)
+        }
+        return '*' in etags or etag in etags
+    if last_modified is None:
+        return False
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+    )
+    return (if_modified_since is not None
+            and int(last_modified.timestamp()) <= if_modified_since)
+
+
+class ConditionalGetMixin:
+    """ETag и 304 для list и retrieve по полю версии модели.
+
+    version_related — связанные объекты, поля которых тоже выводятся
+    в ответе; их версии входят в ETag.
+    """
+
+    version_field = 'updated_at'
+    version_related = ()
+
+    def get_versions(self, instance):
+        objects = [instance] + [
+            getattr(instance, name) for name in self.version_related
+        ]
+        return [
+            (obj.pk, getattr(obj, self.version_field)) for obj in objects
+        ]
+
+    def get_etag(self, request, parts):
+        digest = md5(repr((
+            request.get_full_path(), request.accepted_renderer.format, parts
+        )).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def conditional_response(self, request, etag, last_modified, render):
+        """Отдаёт 304 или ответ render() с заголовками валидаторов."""
+        if is_not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        else:
+            response = render()
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def get_read_queryset(self, queryset):
+        """Queryset, из которого берутся строки для list."""
+        return queryset
+
+    def get_read_object(self):
+        return self.get_object()
+
+    def represent(self, data, many=False):
+        return self.get_serializer(data, many=many).data
+
+    def list(self, request, *args, **kwargs):
+        # Страница Browsable API зависит от пользователя.
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_read_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            page, envelope = list(queryset), None
+        else:
+            envelope = [
+                item for item in self.get_paginated_response([]).data.items()
+                if item[0] != RESULTS_KEY
+            ]
+        versions = [self.get_versions(instance) for instance in page]
+
+        def render():
+            data = self.represent(page, many=True)
+            if envelope is None:
+                return Response(data)
+            return self.get_paginated_response(data)
+
+        return self.conditional_response(
+            request, self.get_etag(request, (envelope, versions)), None,
+            render
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_read_object()
+        versions = self.get_versions(instance)
+        return self.conditional_response(
+            request, self.get_etag(request, versions),
+            max(version for _, version in versions),
+            lambda: Response(self.represent(instance))
+        )
@@ -0,0 +1,72 @@
+"""Хранилище кодов подтверждения в кеше Django.
+
+Код привязан к имени пользователя и живёт CONFIRMATION_CODE_TIMEOUT
+секунд. В кеше лежит только HMAC кода, сравнение идёт за постоянное
+время. После CONFIRMATION_CODE_MAX_ATTEMPTS неудачных попыток код
+удаляется, и его нужно запросить заново; удачная проверка тоже
+удаляет код. Сессии не используются, поэтому токен можно получить
+с любого клиента.
+"""
+import hmac
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import salted_hmac
+
+from .utils import generate_confirmation_code
+
+CODE_KEY = 'confirmation-code:{}'
+ATTEMPTS_KEY = 'confirmation-attempts:{}'
+HMAC_SALT = 'api.confirmation.ConfirmationCodeStore'
+
+
+class ConfirmationCodeStore:
+    """Выдаёт и проверяет коды подтверждения."""
+
+    @property
+    def cache(self):
+        return caches[settings.CONFIRMATION_CODE_CACHE]
+
+    @staticmethod
+    def user_key(username):
+        # Ключ не зависит от символов имени: memcached не принимает
+        # пробелы и не-ASCII символы.
+        return md5(username.encode()).hexdigest()
+
+    @staticmethod
+    def digest(username, code):
+        return salted_hmac(HMAC_SALT, f'{username}:{code}').hexdigest()
+
+    def issue(self, username):
+        """Создаёт новый код и сбрасывает счётчик попыток."""
+        code = generate_confirmation_code()
+        key = self.user_key(username)
+        timeout = settings.CONFIRMATION_CODE_TIMEOUT
+        self.cache.set_many({
+            CODE_KEY.format(key): self.digest(username, code),
+            ATTEMPTS_KEY.format(key): 0,
+        }, timeout)
+        return code
+
+    def verify(self, username, code):
+        """Проверяет код; верный код после проверки удаляется."""
+        key = self.user_key(username)
+        code_key = CODE_KEY.format(key)
+        attempts_key = ATTEMPTS_KEY.format(key)
+        saved = self.cache.get(code_key)
+        if saved is None:
+            return False
+        if hmac.compare_digest(saved, self.digest(username, str(code))):
+            self.cache.delete_many((code_key, attempts_key))
+            return True
+        try:
+            attempts = self.cache.incr(attempts_key)
+        except ValueError:
+            attempts = settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+        if attempts >= settings.CONFIRMATION_CODE_MAX_ATTEMPTS:
+            self.cache.delete_many((code_key, attempts_key))
+        return False
+
+
+confirmation_codes = ConfirmationCodeStore()
@@ -11,3 +11,5 @@ SYSTEM_USERNAME = (
 MAX_CODE_LENGTH = 6
 SUBJECT = 'Подтверждение регистрации'
 USERNAME_SYMBOLS = r'^[\w.@+-]+$'
+SEARCH_RESULTS_LIMIT = 10
+MAX_SEARCH_RESULTS_LIMIT = 50
@@ -1,28 +1,59 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
 
-from reviews.models import Title
+from reviews.models import GenreTitle, Title
+from reviews.search import search_queryset
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Фильтр по списку строк, переданных через запятую."""
 
 
 class TitleFilter(filters.FilterSet):
-    """Кастомный класс фильтрации модели Title."""
+    """Кастомный класс фильтрации модели Title.
+    Все фильтры сравнивают значения точно или по диапазону,
+    чтобы запросы шли по индексам.
+    """
 
-    category = filters.CharFilter(
+    category = CharInFilter(
         field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+        lookup_expr='in'
     )
+    genre = CharInFilter(method='filter_genre')
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    year = filters.NumberFilter(
-        field_name='year',
-        lookup_expr='icontains'
-    )
+    name_prefix = filters.CharFilter(method='filter_name_prefix')
+    year = filters.NumberFilter(field_name='year')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('category', 'genre', 'name', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        # Полусоединение через GenreTitle не размножает строки
+        # и не требует DISTINCT.
+        return queryset.filter(pk__in=GenreTitle.objects.filter(
+            genre__slug__in=value
+        ).values('title_id'))
+
+    def filter_name_prefix(self, queryset, name, value):
+        # Диапазон вместо LIKE, чтобы использовался индекс по name.
+        return queryset.filter(name__gte=value, name__lt=value + '\U0010ffff')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру `search`.
+    Результаты отсортированы по релевантности.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_queryset(queryset, text)
@@ -0,0 +1,312 @@
+"""Воспроизведение записанного трафика против запущенного сервера.
+
+Запросы читаются из JSONL-файла (по объекту на строку с ключами
+method, path или url, headers, body) или из Postman-коллекции и
+отправляются с заданной параллельностью пулом потоков или
+корутинами asyncio. Для каждого эндпоинта считаются пропускная
+способность, гистограмма задержек и доля ошибок.
+"""
+import asyncio
+import http.client
+import json
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from django.urls import Resolver404, resolve
+
+from .benchmark import percentile
+
+RecordedRequest = namedtuple(
+    'RecordedRequest', ('method', 'path', 'headers', 'body')
+)
+
+# Верхние границы корзин гистограммы задержек, мс.
+HISTOGRAM_BUCKETS_MS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf')
+)
+POSTMAN_VARIABLE = re.compile(r'{{\s*([\w.-]+)\s*}}')
+
+
+def split_path(url):
+    """Оставляет от адреса путь и строку запроса."""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    return f'{path}?{parts.query}' if parts.query else path
+
+
+def encode_body(body, headers):
+    if body is None or isinstance(body, str):
+        return body
+    headers.setdefault('Content-Type', 'application/json')
+    return json.dumps(body, ensure_ascii=False)
+
+
+def load_jsonl(path):
+    """Читает записанные запросы; строки без method и path/url
+    пропускаются. Возвращает список запросов и число пропусков.
+    """
+    requests, skipped = [], 0
+    with open(path, encoding='utf-8') as jsonl_file:
+        for line in jsonl_file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if not isinstance(record, dict):
+                skipped += 1
+                continue
+            target = record.get('path') or record.get('url')
+            if not record.get('method') or not target:
+                skipped += 1
+                continue
+            headers = dict(record.get('headers') or {})
+            body = encode_body(record.get('body'), headers)
+            requests.append(RecordedRequest(
+                record['method'].upper(), split_path(target), headers, body
+            ))
+    return requests, skipped
+
+
+def load_postman(path, variables=None):
+    """Читает запросы Postman-коллекции в порядке следования.
+    Переменные {{name}} берутся из variables, затем из коллекции.
+    Скрипты коллекции не выполняются.
+    """
+    with open(path, encoding='utf-8') as collection_file:
+        collection = json.load(collection_file)
+    values = {item['key']: item.get('value', '')
+              for item in collection.get('variable', [])}
+    values.update(variables or {})
+
+    def substitute(text):
+        return POSTMAN_VARIABLE.sub(
+            lambda match: str(values.get(match.group(1), match.group(0))),
+            text
+        )
+
+    def walk(items):
+        for item in items:
+            if 'item' in item:
+                yield from walk(item['item'])
+            elif 'request' in item:
+                yield item['request']
+
+    requests = []
+    for request in walk(collection.get('item', [])):
+        url = request['url']
+        raw_url = url.get('raw', '') if isinstance(url, dict) else url
+        headers = {
+            header['key']: substitute(header.get('value', ''))
+            for header in request.get('header', [])
+            if not header.get('disabled')
+        }
+        auth = request.get('auth') or {}
+        if auth.get('type') == 'bearer':
+            token = {item['key']: item.get('value', '')
+                     for item in auth.get('bearer', [])}.get('token', '')
+            headers['Authorization'] = f'Bearer {substitute(token)}'
+        body = None
+        if (request.get('body') or {}).get('mode') == 'raw':
+            body = substitute(request['body'].get('raw', '')) or None
+            if body is not None:
+                headers.setdefault('Content-Type', 'application/json')
+        requests.append(RecordedRequest(
+            request['method'].upper(), split_path(substitute(raw_url)),
+            headers, body
+        ))
+    return requests
+
+
+def endpoint_name(request):
+    """Имя эндпоинта для статистики: имя маршрута Django
+    или путь без строки запроса.
+    """
+    path = request.path.split('?', 1)[0]
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return f'{request.method} {path}'
+    return f'{request.method} {match.view_name}'
+
+
+class EndpointStats:
+    """Счётчики и задержки одного эндпоинта."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def add(self, latency_ms, status):
+        self.latencies.append(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status is None or status >= 500:
+            self.errors += 1
+
+    def as_dict(self, elapsed):
+        histogram = {}
+        for latency in self.latencies:
+            bucket = next(
+                bound for bound in HISTOGRAM_BUCKETS_MS if latency <= bound
+            )
+            key = f'<={bucket}' if bucket != float('inf') else '>5000'
+            histogram[key] = histogram.get(key, 0) + 1
+        total = len(self.latencies)
+        return {
+            'requests': total,
+            'rps': round(total / elapsed, 1) if elapsed else None,
+            'error_rate': round(self.errors / total, 4),
+            'statuses': {str(status): count for status, count
+                         in sorted(self.statuses.items(), key=str)},
+            'p50_ms': round(percentile(self.latencies, 50), 2),
+            'p95_ms': round(percentile(self.latencies, 95), 2),
+            'p99_ms': round(percentile(self.latencies, 99), 2),
+            'histogram_ms': histogram,
+        }
+
+
+def build_report(results, elapsed):
+    """Собирает отчёт из пар (запрос, задержка, статус)."""
+    endpoints = {}
+    for request, latency, status in results:
+        endpoints.setdefault(
+            endpoint_name(request), EndpointStats()
+        ).add(latency, status)
+    total = len(results)
+    errors = sum(stats.errors for stats in endpoints.values())
+    return {
+        'requests': total,
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(total / elapsed, 1) if elapsed else None,
+        'error_rate': round(errors / total, 4) if total else 0,
+        'endpoints': {
+            name: stats.as_dict(elapsed)
+            for name, stats in sorted(endpoints.items())
+        },
+    }
+
+
+def schedule(requests, total):
+    return list(islice(cycle(requests), total))
+
+
+def replay_threads(requests, base_url, concurrency, total, timeout):
+    """Отправляет запросы из пула потоков; у каждого потока своё
+    keep-alive соединение.
+    """
+    target = urlsplit(base_url)
+    local = threading.local()
+
+    def send(request):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection(
+                target.hostname, target.port or 80, timeout=timeout
+            )
+        body = request.body.encode() if request.body else None
+        started = perf_counter()
+        try:
+            connection.request(
+                request.method, target.path.rstrip('/') + request.path,
+                body=body, headers=request.headers
+            )
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            local.connection = None
+            status = None
+        return request, (perf_counter() - started) * 1000, status
+
+    started = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(send, schedule(requests, total)))
+    return build_report(results, perf_counter() - started)
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def replay_asyncio_workers(requests, base_url, concurrency, timeout):
+    target = urlsplit(base_url)
+    host, port = target.hostname, target.port or 80
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    results = []
+
+    async def worker():
+        reader = writer = None
+        while not queue.empty():
+            request = queue.get_nowait()
+            body = request.body.encode() if request.body else b''
+            headers = {'Host': f'{host}:{port}',
+                       'Content-Length': str(len(body)), **request.headers}
+            head = ''.join(f'{key}: {value}\r\n'
+                           for key, value in headers.items())
+            started = perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(host, port), timeout
+                    )
+                writer.write(
+                    f'{request.method} {target.path.rstrip("/")}'
+                    f'{request.path} HTTP/1.1\r\n{head}\r\n'.encode()
+                    + body
+                )
+                status, keep_alive = await asyncio.wait_for(
+                    read_response(reader), timeout
+                )
+            except (OSError, ValueError, IndexError,
+                    asyncio.IncompleteReadError, asyncio.TimeoutError):
+                status, keep_alive = None, False
+            results.append(
+                (request, (perf_counter() - started) * 1000, status)
+            )
+            if not keep_alive and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def replay_asyncio(requests, base_url, concurrency, total, timeout):
+    """Отправляет запросы из concurrency корутин с собственными
+    keep-alive соединениями.
+    """
+    started = perf_counter()
+    results = asyncio.run(replay_asyncio_workers(
+        schedule(requests, total), base_url, concurrency, timeout
+    ))
+    return build_report(results, perf_counter() - started)
@@ -0,0 +1,141 @@
+"""Очередь исходящих писем в таблице OutgoingEmail.
+
+enqueue_mail только добавляет строку, поэтому задержка почтового
+бэкенда не попадает во время ответа. run_mail_worker забирает письма
+пачками, отправляет их через одно переиспользуемое соединение и при
+ошибке откладывает письмо с экспоненциальной задержкой.
+
+В тексте письма лежит код подтверждения, поэтому после отправки или
+окончательной ошибки текст стирается, а purge_finished удаляет
+обработанные письма старше EMAIL_QUEUE_RETENTION секунд.
+
+Пачка захватывается сдвигом next_attempt_at на EMAIL_QUEUE_LEASE
+секунд и меткой lease: другие воркеры её не видят, а если воркер
+упал, письма вернутся в очередь после истечения аренды.
+"""
+import random
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+RECIPIENTS_SEPARATOR = ','
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    email = OutgoingEmail.objects.create(
+        subject=subject, body=message, from_email=from_email,
+        to=RECIPIENTS_SEPARATOR.join(recipient_list)
+    )
+    if settings.EMAIL_QUEUE_EAGER:
+        sender = MailSender()
+        try:
+            sender.send_batch([email])
+        finally:
+            sender.close()
+    return email
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: экспонента с джиттером."""
+    delay = min(
+        settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_QUEUE_MAX_RETRY_DELAY
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim_batch(size):
+    """Захватывает до size писем, готовых к отправке."""
+    now = timezone.now()
+    ready = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.StatusChoices.PENDING, next_attempt_at__lte=now
+    )
+    ids = list(
+        ready.order_by('next_attempt_at', 'pk').values_list('pk', flat=True)
+        [:size]
+    )
+    if not ids:
+        return []
+    lease = uuid4().hex
+    ready.filter(pk__in=ids).update(
+        lease=lease,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+    )
+    return list(OutgoingEmail.objects.filter(lease=lease).order_by('pk'))
+
+
+class MailSender:
+    """Отправляет письма через одно соединение почтового бэкенда."""
+
+    def __init__(self):
+        self.connection = None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def send(self, email):
+        if self.connection is None:
+            self.connection = get_connection()
+            self.connection.open()
+        message = EmailMessage(
+            email.subject, email.body, email.from_email,
+            email.to.split(RECIPIENTS_SEPARATOR), connection=self.connection
+        )
+        try:
+            message.send()
+        except Exception:
+            # После ошибки соединение может быть в неизвестном состоянии.
+            self.close()
+            raise
+
+    def send_batch(self, emails):
+        """Отправляет письма и сохраняет результат.
+        Возвращает число отправленных.
+        """
+        sent = 0
+        for email in emails:
+            email.attempts += 1
+            email.lease = ''
+            try:
+                self.send(email)
+            except Exception as error:
+                email.last_error = f'{type(error).__name__}: {error}'
+                if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+                    email.status = OutgoingEmail.StatusChoices.FAILED
+                else:
+                    email.next_attempt_at = (
+                        timezone.now() + retry_delay(email.attempts)
+                    )
+            else:
+                email.status = OutgoingEmail.StatusChoices.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                sent += 1
+            if email.status != OutgoingEmail.StatusChoices.PENDING:
+                email.body = ''
+        OutgoingEmail.objects.bulk_update(emails, (
+            'status', 'attempts', 'next_attempt_at', 'lease', 'last_error',
+            'sent_at', 'body'
+        ))
+        return sent
+
+
+def purge_finished():
+    """Удаляет отправленные и неотправленные письма старше
+    EMAIL_QUEUE_RETENTION секунд. Возвращает число удалённых.
+    """
+    deleted, _ = OutgoingEmail.objects.exclude(
+        status=OutgoingEmail.StatusChoices.PENDING
+    ).filter(
+        created_at__lt=timezone.now() - timedelta(
+            seconds=settings.EMAIL_QUEUE_RETENTION
+        )
+    ).delete()
+    return deleted
@@ -0,0 +1,229 @@
+import logging
+import platform
+import re
+from datetime import datetime, timezone
+from itertools import count
+
+import django
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.authentication import ClaimsAccessToken
+from api import throttling
+from api.benchmark import (
+    REPORT_METRICS,
+    Scenario,
+    compare_reports,
+    isolated_storage,
+    load_report,
+    measure,
+    save_report
+)
+from api.urls import router_v1
+from reviews.models import Comment, OutgoingEmail, Title, User
+
+
+class Command(BaseCommand):
+    """Замеряет задержку, число SQL-запросов и память для каждого
+    маршрута API на сгенерированном наборе данных.
+    Работает на отдельной тестовой базе, рабочая база не меняется.
+    """
+
+    help = 'Нагрузочный замер всех маршрутов API с отчётом в JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--titles', type=int, default=500)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Число запросов к каждому маршруту.'
+        )
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Куда сохранить отчёт.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Отчёт предыдущего запуска для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост задержки и памяти (доля, 0.2 = 20%%).'
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=2.0,
+            help='Рост задержки меньше этого значения считается шумом.'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть положительным')
+        baseline = load_report(options['compare']) if options[
+            'compare'] else None
+
+        # Ответы 4xx в сценариях ожидаемы и не должны засорять вывод.
+        request_logger = logging.getLogger('django.request')
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with isolated_storage():
+                routes = self.run_scenarios(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            request_logger.setLevel(log_level)
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'dataset': {
+                    name: options[name] for name in
+                    ('users', 'titles', 'reviews', 'comments', 'seed')
+                },
+                'requests': options['requests'],
+            },
+            'routes': routes,
+        }
+        save_report(report, options['output'])
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}')
+
+        if baseline is None:
+            return
+        regressions = compare_reports(
+            baseline, report, options['threshold'], options['min_delta_ms']
+        )
+        for name, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(
+                f'{name}: {metric} {old} -> {new}'
+            ))
+        if regressions:
+            raise CommandError(f'Найдено регрессий: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий не найдено'))
+
+    def run_scenarios(self, options):
+        call_command(
+            'generate_data', users=options['users'],
+            titles=options['titles'], reviews=options['reviews'],
+            comments=options['comments'], seed=options['seed'],
+            stdout=self.stdout
+        )
+        routes = {}
+        for scenario in self.get_scenarios():
+            for route_cache in caches.all():
+                route_cache.clear()
+            throttling.store.clear()
+            routes[scenario.name] = measure(scenario, options['requests'])
+            self.print_route(scenario.name, routes[scenario.name])
+        return routes
+
+    def print_route(self, name, result):
+        metrics = ', '.join(
+            f'{metric}={result[metric]}' for metric in REPORT_METRICS
+        )
+        self.stdout.write(f'{name}: {metrics}, statuses={result["statuses"]}')
+
+    def get_scenarios(self):
+        admin = User.objects.create_user(
+            username='benchmark-admin', email='benchmark-admin@yamdb.fake',
+            role=User.RoleChoices.ADMIN
+        )
+        anon = APIClient()
+        admin_client = APIClient()
+        admin_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(admin)}'
+        )
+        title = Title.objects.order_by('-rating_count').first()
+        review = title.reviews.order_by('-pk').first()
+        comment = Comment.objects.select_related('review').first()
+        category = title.category
+        genre = title.genre.first()
+        user = User.objects.exclude(pk=admin.pk).first()
+        word = re.findall(r'\w+', review.text)[0]
+        usernames = (f'benchmark{number}' for number in count())
+
+        def get(client, name, **kwargs):
+            url = reverse(f'api:{name}', kwargs=kwargs)
+            return Scenario(name, lambda: client.get(url))
+
+        def reset_throttles():
+            # Сотни регистраций подряд упёрлись бы в лимиты signup/token,
+            # а замерять нужно обработку, а не ответ 429.
+            throttling.store.clear()
+            return ()
+
+        def signup_data():
+            reset_throttles()
+            username = next(usernames)
+            return ({'username': username,
+                     'email': f'{username}@yamdb.fake'},)
+
+        def signup(data):
+            return anon.post(reverse('api:signup'), data)
+
+        def token_data():
+            data, = signup_data()
+            signup(data)
+            reset_throttles()
+            code = re.search(
+                r'\d+$', OutgoingEmail.objects.latest('pk').body
+            ).group()
+            return ({'username': data['username'],
+                     'confirmation_code': code},)
+
+        def token(data):
+            return anon.post(reverse('api:token'), data)
+
+        search_url = reverse('api:search')
+        scenarios = [
+            get(anon, 'api-root'),
+            get(anon, 'categories-list'),
+            get(anon, 'categories-detail', slug=category.slug),
+            get(anon, 'genres-list'),
+            get(anon, 'genres-detail', slug=genre.slug),
+            get(anon, 'title-list'),
+            get(anon, 'title-detail', pk=title.pk),
+            get(anon, 'reviews-list', title_id=title.pk),
+            get(anon, 'reviews-detail', title_id=title.pk, pk=review.pk),
+            get(anon, 'comments-list', title_id=comment.review.title_id,
+                review_id=comment.review_id),
+            get(anon, 'comments-detail', title_id=comment.review.title_id,
+                review_id=comment.review_id, pk=comment.pk),
+            get(admin_client, 'users-list'),
+            get(admin_client, 'users-detail', username=user.username),
+            get(admin_client, 'users-me'),
+            Scenario('search', lambda: anon.get(search_url, {'q': word})),
+            Scenario('signup', signup, signup_data),
+            Scenario('signup-repeat', lambda: signup(
+                {'username': user.username, 'email': user.email}
+            ), reset_throttles),
+            Scenario('signup-conflict', lambda: signup(
+                {'username': user.username, 'email': 'conflict@yamdb.fake'}
+            ), reset_throttles),
+            Scenario('token', token, token_data),
+        ]
+
+        covered = {scenario.name for scenario in scenarios}
+        for url in router_v1.urls:
+            if url.name not in covered:
+                self.stdout.write(self.style.WARNING(
+                    f'Маршрут {url.name} не покрыт сценарием'
+                ))
+                covered.add(url.name)
+        return scenarios
@@ -0,0 +1,97 @@
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api import renderers
+from api.benchmark import WARMUP_REQUESTS, isolated_storage, percentile
+
+
+class Command(BaseCommand):
+    """Сравнивает JSONRenderer DRF и FastJSONRenderer на страницах
+    /api/v1/titles/ разного размера.
+    Работает на отдельной тестовой базе, рабочая база не меняется.
+    """
+
+    help = 'Микробенчмарк рендеринга JSON страниц произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--page-size', type=int, nargs='+', default=[5, 20, 100],
+            help='Размеры страниц, на которых сравнивать.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Число рендерингов каждой страницы.'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть положительным')
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson не установлен: FastJSONRenderer использует json'
+            ))
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with isolated_storage():
+                payloads = self.get_payloads(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for page_size, data in payloads:
+            self.compare(page_size, data, options['repeat'])
+
+    def get_payloads(self, options):
+        call_command(
+            'generate_data', users=10, titles=options['titles'],
+            reviews=options['titles'], comments=0, seed=options['seed'],
+            stdout=self.stdout
+        )
+        client = APIClient()
+        url = reverse('api:title-list')
+        return [
+            (page_size, client.get(url, {'page_size': page_size}).data)
+            for page_size in options['page_size']
+        ]
+
+    def compare(self, page_size, data, repeat):
+        results = {}
+        for name, renderer in (('json', JSONRenderer()),
+                               ('fast', renderers.FastJSONRenderer())):
+            for _ in range(WARMUP_REQUESTS):
+                renderer.render(data)
+            latencies = []
+            for _ in range(repeat):
+                started = perf_counter()
+                content = renderer.render(data)
+                latencies.append((perf_counter() - started) * 1000)
+            results[name] = (percentile(latencies, 50), content)
+
+        (json_ms, json_content), (fast_ms, fast_content) = (
+            results['json'], results['fast']
+        )
+        self.stdout.write(
+            f'page_size={page_size}: bytes={len(json_content)}, '
+            f'json p50_ms={json_ms:.3f}, fast p50_ms={fast_ms:.3f}, '
+            f'ускорение x{json_ms / fast_ms:.1f}'
+        )
+        if json_content != fast_content:
+            self.stdout.write(self.style.ERROR(
+                f'page_size={page_size}: вывод рендереров различается'
+            ))
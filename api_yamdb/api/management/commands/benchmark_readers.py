@@ -0,0 +1,121 @@
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment
+)
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmark import WARMUP_REQUESTS, percentile
+from api.readers import CommentReader, ReviewReader, TitleReader
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    """Сравнивает сериализаторы и readers (api.readers) на страницах
+    произведений, отзывов и комментариев: выборка из базы и сборка
+    данных ответа. Проверяет, что JSON обоих путей совпадает.
+    Работает на отдельной тестовой базе, рабочая база не меняется.
+    """
+
+    help = 'Микробенчмарк чтения страниц через сериализаторы и readers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=500)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--page-size', type=int, nargs='+', default=[10, 100],
+            help='Размеры страниц, на которых сравнивать.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Число чтений каждой страницы.'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть положительным')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            call_command(
+                'generate_data', users=50, titles=options['titles'],
+                reviews=options['reviews'], comments=options['comments'],
+                seed=options['seed'], stdout=self.stdout
+            )
+            for name, reader, queryset in self.get_querysets():
+                for page_size in options['page_size']:
+                    self.compare(
+                        name, reader, queryset, page_size, options['repeat']
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def get_querysets(self):
+        # Querysets тех же видов, что во viewsets; отзывы и комментарии
+        # берутся у самых обсуждаемых произведения и отзыва.
+        title = Title.objects.annotate(
+            total=Count('reviews')
+        ).order_by('-total').first()
+        review = Review.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total').first()
+        return (
+            ('titles', TitleReader(), Title.objects.select_related(
+                'category'
+            ).prefetch_related('genre').order_by('id')),
+            ('reviews', ReviewReader(),
+             title.reviews.select_related('author')),
+            ('comments', CommentReader(),
+             review.comments.select_related('author')),
+        )
+
+    def read(self, reader, queryset, page_size):
+        return reader.serializer_class(
+            queryset[:page_size], many=True
+        ).data
+
+    def read_values(self, reader, queryset, page_size):
+        return reader.represent(
+            reader.prepare(queryset)[:page_size], many=True
+        )
+
+    def compare(self, name, reader, queryset, page_size, repeat):
+        results = {}
+        for path, read in (('serializer', self.read),
+                           ('reader', self.read_values)):
+            for _ in range(WARMUP_REQUESTS):
+                read(reader, queryset, page_size)
+            latencies = []
+            for _ in range(repeat):
+                started = perf_counter()
+                data = read(reader, queryset, page_size)
+                latencies.append((perf_counter() - started) * 1000)
+            results[path] = (
+                percentile(latencies, 50), len(data),
+                JSONRenderer().render(data)
+            )
+
+        (serializer_ms, rows, serializer_content), (
+            reader_ms, _, reader_content
+        ) = results['serializer'], results['reader']
+        self.stdout.write(
+            f'{name} page_size={page_size}: rows={rows}, '
+            f'serializer p50_ms={serializer_ms:.3f}, '
+            f'reader p50_ms={reader_ms:.3f}, '
+            f'ускорение x{serializer_ms / reader_ms:.1f}'
+        )
+        if serializer_content != reader_content:
+            self.stdout.write(self.style.ERROR(
+                f'{name} page_size={page_size}: ответы различаются'
+            ))
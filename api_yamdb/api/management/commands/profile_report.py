@@ -0,0 +1,64 @@
+import pstats
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.middleware import DEFAULT_PROFILER_DIR
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    """Сводит pstats-файлы ProfilerMiddleware по маршрутам
+    и печатает самые тяжёлые функции.
+    """
+
+    help = 'Объединяет профили запросов и печатает топ функций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path,
+            default=getattr(settings, 'PROFILER_DIR', DEFAULT_PROFILER_DIR),
+            help='Каталог с профилями.'
+        )
+        parser.add_argument(
+            '--route', action='append', default=[],
+            help='Имя маршрута, например title-list. По умолчанию все.'
+        )
+        parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument(
+            '--limit', type=int, default=25,
+            help='Сколько функций показать.'
+        )
+        parser.add_argument(
+            '--output', help='Сохранить объединённый профиль в pstats-файл.'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['path']
+        if not directory.is_dir():
+            raise CommandError(f'Каталог {directory} не найден')
+        routes = options['route'] or sorted(
+            path.name for path in directory.iterdir() if path.is_dir()
+        )
+        files = [
+            str(path) for route in routes
+            for path in sorted((directory / route).glob('*.prof'))
+        ]
+        if not files:
+            raise CommandError('Профили не найдены')
+
+        output = StringIO()
+        stats = pstats.Stats(*files, stream=output)
+        if options['output']:
+            stats.dump_stats(options['output'])
+            self.stdout.write(f'Профиль сохранён в {options["output"]}')
+        self.stdout.write(
+            f'Маршруты: {", ".join(routes)}; профилей: {len(files)}'
+        )
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(
+            options['limit']
+        )
+        self.stdout.write(output.getvalue())
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import save_report
+from api.loadtest import (
+    load_jsonl,
+    load_postman,
+    replay_asyncio,
+    replay_threads
+)
+
+DEFAULT_JSONL = Path(settings.BASE_DIR).parent / 'requests.jsonl'
+REPLAYERS = {'thread': replay_threads, 'asyncio': replay_asyncio}
+
+
+class Command(BaseCommand):
+    """Воспроизводит записанные запросы против запущенного сервера
+    (runserver, gunicorn, uvicorn) и печатает статистику по эндпоинтам.
+    Сервер и его база не создаются: команда только отправляет запросы.
+    """
+
+    help = 'Нагрузочный прогон записанного трафика с отчётом по эндпоинтам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000',
+            help='Адрес запущенного сервера.'
+        )
+        parser.add_argument(
+            '--jsonl', type=Path, action='append',
+            help='JSONL с запросами: method, path или url, headers, body. '
+                 f'По умолчанию {DEFAULT_JSONL}.'
+        )
+        parser.add_argument(
+            '--postman', type=Path, action='append', default=[],
+            help='Postman-коллекция с запросами.'
+        )
+        parser.add_argument(
+            '--var', action='append', default=[], metavar='KEY=VALUE',
+            help='Значение переменной Postman, например adminToken=...'
+        )
+        parser.add_argument(
+            '--mode', choices=sorted(REPLAYERS), default='thread'
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--requests', type=int,
+            help='Общее число запросов; записи повторяются по кругу. '
+                 'По умолчанию каждая запись отправляется один раз.'
+        )
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--output', help='Куда сохранить отчёт в JSON.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency должен быть положительным')
+        requests = self.load_requests(options)
+        if not requests:
+            raise CommandError('Нет запросов для воспроизведения')
+
+        total = options['requests'] or len(requests)
+        report = REPLAYERS[options['mode']](
+            requests, options['base_url'], options['concurrency'], total,
+            options['timeout']
+        )
+        for name, stats in report['endpoints'].items():
+            self.stdout.write(
+                f'{name}: {stats["requests"]} запросов, '
+                f'{stats["rps"]} rps, p50={stats["p50_ms"]} '
+                f'p95={stats["p95_ms"]} p99={stats["p99_ms"]} мс, '
+                f'ошибки {stats["error_rate"]:.1%}, '
+                f'статусы {stats["statuses"]}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {report["requests"]} запросов за {report["elapsed_s"]} с: '
+            f'{report["rps"]} rps, ошибки {report["error_rate"]:.1%}'
+        ))
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(f'Отчёт сохранён в {options["output"]}')
+
+    def load_requests(self, options):
+        variables = {}
+        for item in options['var']:
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'--var {item}: ожидается KEY=VALUE')
+            variables[key] = value
+
+        jsonl_paths = options['jsonl']
+        if jsonl_paths is None:
+            jsonl_paths = [] if options['postman'] else [DEFAULT_JSONL]
+        for path in jsonl_paths + options['postman']:
+            if not path.exists():
+                raise CommandError(f'Файл {path} не найден')
+
+        requests = []
+        for path in jsonl_paths:
+            loaded, skipped = load_jsonl(path)
+            requests.extend(loaded)
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f'{path}: пропущено строк без method и path: {skipped}'
+                ))
+        for path in options['postman']:
+            requests.extend(load_postman(path, variables))
+        return requests
@@ -0,0 +1,97 @@
+import threading
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from api.mail_queue import MailSender, claim_batch, purge_finished
+
+
+class Command(BaseCommand):
+    """Отправляет письма из очереди OutgoingEmail.
+    Каждый поток держит своё соединение с почтовым бэкендом.
+    Основной поток раз в EMAIL_QUEUE_PURGE_INTERVAL секунд удаляет
+    старые обработанные письма.
+    """
+
+    help = 'Запускает воркер отправки писем из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Число потоков отправки.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_QUEUE_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=settings.EMAIL_QUEUE_POLL_INTERVAL,
+            help='Пауза, если очередь пуста, в секундах.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать готовые письма и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('threads', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} должен '
+                                   'быть положительным')
+        self.stop = threading.Event()
+        self.sent = 0
+        self.lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self.work, args=(options,), daemon=True
+            )
+            for _ in range(options['threads'])
+        ]
+        self.purged = 0
+        self.purge()
+        for thread in threads:
+            thread.start()
+        try:
+            next_purge = monotonic() + settings.EMAIL_QUEUE_PURGE_INTERVAL
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+                    if monotonic() >= next_purge:
+                        self.purge()
+                        next_purge = (
+                            monotonic() + settings.EMAIL_QUEUE_PURGE_INTERVAL
+                        )
+        except KeyboardInterrupt:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {self.sent}, удалено старых: {self.purged}'
+        ))
+
+    def purge(self):
+        close_old_connections()
+        self.purged += purge_finished()
+
+    def work(self, options):
+        sender = MailSender()
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                batch = claim_batch(options['batch_size'])
+                if batch:
+                    sent = sender.send_batch(batch)
+                    with self.lock:
+                        self.sent += sent
+                    continue
+                if options['once']:
+                    return
+                # Соединение не держим открытым, пока очередь пуста.
+                sender.close()
+                self.stop.wait(options['poll_interval'])
+        finally:
+            sender.close()
+            connection.close()
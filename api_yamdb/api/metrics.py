@@ -0,0 +1,212 @@
+"""Метрики в формате Prometheus без внешних сервисов.
+
+Каждый процесс копит счётчики и гистограммы в памяти и периодически
+сбрасывает их в свой файл в METRICS_DIR. Эндпоинт /metrics читает файлы
+всех процессов и суммирует их, поэтому метрики сходятся при нескольких
+воркерах gunicorn/uwsgi. Файлы завершившихся процессов остаются, чтобы
+счётчики не убывали; каталог очищают при деплое.
+"""
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+from tempfile import gettempdir
+from time import monotonic, time_ns
+
+from django.conf import settings
+
+DEFAULT_METRICS_DIR = Path(gettempdir()) / 'api_yamdb_metrics'
+DEFAULT_FLUSH_INTERVAL = 1
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Границы корзин гистограммы задержек, как у клиента Prometheus.
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'Число HTTP-запросов.'
+    ),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'Время обработки HTTP-запроса.'
+    ),
+    'yamdb_db_queries_total': (
+        'counter', 'Число SQL-запросов.'
+    ),
+    'yamdb_db_query_duration_seconds_total': (
+        'counter', 'Суммарное время SQL-запросов.'
+    ),
+    'yamdb_db_connections_total': (
+        'counter', 'Число открытых соединений с базой.'
+    ),
+    'yamdb_cache_requests_total': (
+        'counter', 'Обращения к кешу с результатом hit или miss.'
+    ),
+    'yamdb_single_flight_total': (
+        'counter',
+        'Промахи кеша, обслуженные без пересчёта: stale, waited, timeout.'
+    ),
+}
+
+
+def metrics_dir():
+    return Path(getattr(settings, 'METRICS_DIR', DEFAULT_METRICS_DIR))
+
+
+class MetricsStore:
+    """Метрики текущего процесса с периодическим сбросом в файл."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # После fork дочерний процесс начинает с нуля и пишет
+        # в собственный файл.
+        self.pid = os.getpid()
+        self.filename = f'{self.pid}-{time_ns()}.json'
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = monotonic()
+
+    def check_pid(self):
+        if self.pid != os.getpid():
+            self.reset()
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(
+            (label, str(value)) for label, value in labels.items()
+        ))
+
+    def inc(self, name, labels, value=1):
+        key = self.key(name, labels)
+        with self.lock:
+            self.check_pid()
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.maybe_flush()
+
+    def observe(self, name, labels, value):
+        key = self.key(name, labels)
+        with self.lock:
+            self.check_pid()
+            buckets = self.histograms.setdefault(
+                key, [0] * len(DURATION_BUCKETS) + [0, 0]
+            )
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    buckets[index] += 1
+            buckets[-2] += value
+            buckets[-1] += 1
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        interval = getattr(
+            settings, 'METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL
+        )
+        if monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.check_pid()
+            if not self.counters and not self.histograms:
+                return
+            snapshot = {
+                'counters': [[name, labels, value] for (name, labels), value
+                             in self.counters.items()],
+                'histograms': [[name, labels, buckets]
+                               for (name, labels), buckets
+                               in self.histograms.items()],
+            }
+            self.last_flush = monotonic()
+            filename = self.filename
+        directory = metrics_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        temporary = directory / f'.{filename}.tmp'
+        temporary.write_text(json.dumps(snapshot), encoding='utf-8')
+        os.replace(temporary, directory / filename)
+
+
+store = MetricsStore()
+atexit.register(store.flush)
+
+
+def inc(name, value=1, **labels):
+    store.inc(name, labels, value)
+
+
+def observe(name, value, **labels):
+    store.observe(name, labels, value)
+
+
+def observe_cache(cache_name, hit):
+    inc('yamdb_cache_requests_total', cache=cache_name,
+        result='hit' if hit else 'miss')
+
+
+def count_connection(sender, connection, **kwargs):
+    inc('yamdb_db_connections_total', database=connection.alias)
+
+
+def collect():
+    """Суммирует файлы всех процессов."""
+    store.flush()
+    counters, histograms = {}, {}
+    directory = metrics_dir()
+    if not directory.is_dir():
+        return counters, histograms
+    for path in directory.glob('*.json'):
+        try:
+            snapshot = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(buckets))
+            for index, value in enumerate(buckets):
+                total[index] += value
+    return counters, histograms
+
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render():
+    """Текст в формате экспозиции Prometheus 0.0.4."""
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{format_labels(labels)} {value}')
+        for (metric, labels), buckets in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                lines.append(
+                    f'{name}_bucket{format_labels(labels, le=bound)} {count}'
+                )
+            lines.append(
+                f'{name}_bucket{format_labels(labels, le="+Inf")} '
+                f'{buckets[-1]}'
+            )
+            lines.append(f'{name}_sum{format_labels(labels)} {buckets[-2]}')
+            lines.append(
+                f'{name}_count{format_labels(labels)} {buckets[-1]}'
+            )
+    return '\n'.join(lines) + '\n'
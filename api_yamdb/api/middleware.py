@@ -0,0 +1,289 @@
+"""Замер производительности каждого запроса.
+
+PerformanceMiddleware считает общее время, время в базе, число
+SQL-запросов и их повторов, время сериализации и размер ответа.
+Метрики отдаются в заголовке Server-Timing и пишутся одной строкой
+JSON в логгер api.performance. Если запрос превысил
+PERFORMANCE_QUERY_BUDGET, в лог уходит предупреждение со слепками
+(fingerprint) самых частых SQL-запросов — так видны N+1.
+
+MetricsMiddleware копит те же данные в счётчиках api.metrics
+для эндпоинта /metrics.
+
+ProfilerMiddleware профилирует cProfile долю PROFILER_SAMPLE_RATE
+запросов, а также запросы администратора с заголовком X-Profile или
+параметром ?profile=1, и сохраняет pstats-файлы по маршрутам
+в PROFILER_DIR.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from tempfile import gettempdir
+from time import perf_counter, time_ns
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from . import metrics
+from .authentication import ClaimsJWTAuthentication
+
+logger = logging.getLogger('api.performance')
+
+DEFAULT_QUERY_BUDGET = 10
+DEFAULT_PROFILER_DIR = Path(gettempdir()) / 'api_yamdb_profiles'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+FINGERPRINTS_IN_WARNING = 5
+IN_PLACEHOLDERS = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SPACES = re.compile(r'\s+')
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+def fingerprint(sql):
+    """Приводит SQL к шаблону: литералы и списки IN заменяются на ?."""
+    sql = IN_PLACEHOLDERS.sub('(...)', sql)
+    sql = LITERALS.sub('?', sql.replace('%s', '?'))
+    return SPACES.sub(' ', sql).strip()
+
+
+class QueryCounter:
+    """Число и суммарное время SQL-запросов без их текста.
+    Дешёвая обёртка для MetricsMiddleware, которая работает всегда.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка для connection.execute_wrapper.
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.count += 1
+
+
+class RequestMetrics(QueryCounter):
+    """Метрики одного запроса с текстом SQL для PerformanceMiddleware."""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+        self.serializer_time = 0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        try:
+            return super().__call__(execute, sql, params, many, context)
+        finally:
+            self.queries.append((sql, repr(params)))
+
+    @property
+    def duplicates(self):
+        """Число точных повторов: тот же SQL с теми же параметрами."""
+        return len(self.queries) - len(set(self.queries))
+
+    def fingerprints(self):
+        return Counter(fingerprint(sql) for sql, _ in self.queries)
+
+
+@contextmanager
+def measure_serialization():
+    """Учитывает время блока как время сериализации запроса.
+    Вложенные замеры не считаются повторно.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += perf_counter() - started
+        metrics.serializing = False
+
+
+class TimedRepresentationMixin:
+    """Учитывает время to_representation в метриках запроса."""
+
+    def to_representation(self, instance):
+        with measure_serialization():
+            return super().to_representation(instance)
+
+
+class PerformanceMiddleware:
+    """Добавляет метрики производительности в ответ и в лог."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        total = perf_counter() - started
+
+        size = (
+            None if response.streaming else len(response.content)
+        )
+        response['Server-Timing'] = ', '.join((
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{len(metrics.queries)} queries, '
+            f'{metrics.duplicates} duplicates"',
+            f'serializer;dur={metrics.serializer_time * 1000:.1f}',
+        ))
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'queries': len(metrics.queries),
+            'duplicate_queries': metrics.duplicates,
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+            'response_bytes': size,
+        }, ensure_ascii=False))
+
+        budget = getattr(
+            settings, 'PERFORMANCE_QUERY_BUDGET', DEFAULT_QUERY_BUDGET
+        )
+        if len(metrics.queries) > budget:
+            logger.warning(
+                '%s %s: %s SQL-запросов при бюджете %s. Частые запросы:\n%s',
+                request.method, request.path, len(metrics.queries), budget,
+                '\n'.join(
+                    f'{count} x {sql}' for sql, count in
+                    metrics.fingerprints().most_common(
+                        FINGERPRINTS_IN_WARNING
+                    )
+                )
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """Считает запросы, их длительность и SQL-запросы по маршрутам
+    и действиям viewset для эндпоинта /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(queries)
+                )
+            response = self.get_response(request)
+        duration = perf_counter() - started
+
+        match = request.resolver_match
+        route = match.url_name if match else 'unmatched'
+        actions = getattr(match.func, 'actions', None) if match else None
+        action = (actions or {}).get(
+            request.method.lower(), request.method.lower()
+        )
+        labels = {'route': route or 'unnamed', 'action': action}
+        metrics.inc(
+            'yamdb_http_requests_total', method=request.method,
+            status=response.status_code, **labels
+        )
+        metrics.observe(
+            'yamdb_http_request_duration_seconds', duration, **labels
+        )
+        if queries.count:
+            metrics.inc('yamdb_db_queries_total', queries.count, **labels)
+            metrics.inc(
+                'yamdb_db_query_duration_seconds_total', queries.db_time,
+                **labels
+            )
+        return response
+
+
+class ProfilerMiddleware:
+    """Профилирует выборку запросов и пишет pstats-файлы
+    в PROFILER_DIR/<маршрут>/. Файлы сводит команда profile_report.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.authentication = ClaimsJWTAuthentication()
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        match = request.resolver_match
+        route = (match.url_name if match else None) or 'unmatched'
+        directory = Path(getattr(
+            settings, 'PROFILER_DIR', DEFAULT_PROFILER_DIR
+        )) / route
+        directory.mkdir(parents=True, exist_ok=True)
+        filename = f'{time_ns()}-{os.getpid()}.prof'
+        profiler.dump_stats(directory / filename)
+        response['X-Profile-File'] = f'{route}/{filename}'
+        return response
+
+    def should_profile(self, request):
+        requested = (
+            request.META.get(PROFILE_HEADER, '') not in ('', '0')
+            or request.GET.get(PROFILE_PARAM, '') not in ('', '0')
+        )
+        if requested:
+            return self.is_admin(request)
+        rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0)
+        if not rate or random.random() >= rate:
+            return False
+        routes = getattr(settings, 'PROFILER_ROUTES', ())
+        if not routes:
+            return True
+        try:
+            return resolve(request.path_info).url_name in routes
+        except Resolver404:
+            return False
+
+    def is_admin(self, request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                authenticated = self.authentication.authenticate(request)
+            except (AuthenticationFailed, InvalidToken):
+                return False
+            if authenticated is None:
+                return False
+            user = authenticated[0]
+        return user.is_admin
@@ -0,0 +1,255 @@
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import single_flight
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (pub_date, id) от новых записей к старым.
+    Страница выбирается условием по ключу, а не OFFSET, и без COUNT(*),
+    поэтому стоимость глубоких страниц не растёт.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by('pub_date', 'pk')
+            if position is not None:
+                pub_date, pk = position
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                )
+        else:
+            queryset = queryset.order_by('-pub_date', '-pk')
+            if position is not None:
+                pub_date, pk = position
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            reverse, pub_date, pk = b64decode(
+                encoded.encode('ascii'), validate=True
+            ).decode('ascii').split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None or reverse not in ('0', '1'):
+            raise NotFound(self.invalid_cursor_message)
+        return (pub_date, pk), reverse == '1'
+
+    def encode_cursor(self, instance, reverse):
+        # Страница может состоять из строк .values() (api.readers).
+        if isinstance(instance, dict):
+            pub_date, pk = instance['pub_date'], instance['id']
+        else:
+            pub_date, pk = instance.pub_date, instance.pk
+        raw = f'{int(reverse)}|{pub_date.isoformat()}|{pk}'
+        encoded = b64encode(raw.encode('ascii')).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с возможностью переключиться на курсоры.
+    По умолчанию работает как PageNumberPagination; при `?pagination=cursor`
+    или переданном `cursor` страницы отдаёт KeysetPagination.
+    """
+
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_paginator = None
+        if (request.query_params.get(self.mode_query_param)
+                == self.keyset_mode
+                or self.keyset_pagination_class.cursor_query_param
+                in request.query_params):
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class OptionalCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация, которая умеет не считать COUNT(*).
+    Режим подсчёта задаётся параметром `?count=` или настройкой
+    PAGINATION_COUNT_MODE:
+    - exact — точное число записей, как в PageNumberPagination;
+    - cached — число берётся из кеша и пересчитывается по истечении
+      PAGINATION_COUNT_CACHE_TIMEOUT секунд одним запросом
+      (api.single_flight);
+    - none — `count` равен None.
+    Без точного подсчёта наличие следующей страницы определяется выборкой
+    на одну запись больше размера страницы.
+    Размер страницы можно задать `?page_size=`, но не больше
+    PAGINATION_MAX_PAGE_SIZE.
+    """
+
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    count_modes = ('exact', 'cached', 'none')
+
+    def __init__(self):
+        self.max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+        self.default_count_mode = settings.PAGINATION_COUNT_MODE
+        self.count_cache_timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+        self.count_stale_timeout = settings.PAGINATION_COUNT_STALE_TIMEOUT
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode in self.count_modes:
+            return mode
+        return self.default_count_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == 'exact':
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            page_number = int(page_number)
+            if page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message)
+
+        offset = (page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and page_number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.request = request
+        self.page_number = page_number
+        self.has_next = len(results) > page_size
+        self.count = (
+            self.get_cached_count(queryset)
+            if self.count_mode == 'cached' else None
+        )
+        return results[:page_size]
+
+    def get_cached_count(self, queryset):
+        key = 'pagination-count:{}:{}'.format(
+            queryset.model._meta.label_lower,
+            md5(str(queryset.query).encode()).hexdigest()
+        )
+        # Пока один запрос пересчитывает COUNT(*), остальные получают
+        # прежнее значение.
+        return single_flight.get_or_set(
+            caches[settings.PAGINATION_COUNT_CACHE], key, queryset.count,
+            self.count_cache_timeout, self.count_stale_timeout,
+            'pagination_count'
+        )
+
+    def get_paginated_response(self, data):
+        if self.count_mode == 'exact':
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_next_link(self):
+        if self.count_mode == 'exact':
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.count_mode == 'exact':
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
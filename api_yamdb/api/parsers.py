@@ -0,0 +1,37 @@
+"""Парсер JSON на orjson с запасным путём через стандартный json.
+
+Тело в UTF-8 разбирается orjson. Если он не справился (другая
+кодировка, ошибка синтаксиса), то же тело разбирает JSONParser DRF,
+поэтому и результат, и текст ошибки совпадают со стандартными.
+Целые больше 64 бит orjson молча превращает во float, поэтому тела
+с длинными числами сразу идут в JSONParser.
+"""
+import re
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+UTF8 = ('utf-8', 'utf8')
+LONG_NUMBER = re.compile(rb'\d{19,}')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser, который разбирает тело через orjson."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER.search(body):
+            return super().parse(BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
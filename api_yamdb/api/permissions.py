@@ -13,7 +13,7 @@ class IsAdminIsModeratorIsAuthorOrReadOnly(BasePermission):
         return (request.method in SAFE_METHODS
                 or request.user.is_admin
                 or request.user.is_moderator
-                or obj.author == request.user
+                or obj.author_id == request.user.pk
                 )
 
 
@@ -0,0 +1,202 @@
+"""Быстрое чтение произведений, отзывов и комментариев без ModelSerializer.
+
+Reader выбирает строки через .values() и собирает словари ответа
+заранее подготовленными функциями доступа: без создания моделей,
+get_attribute и вложенных сериализаторов на каждую строку. Порядок
+и набор полей берутся из сериализатора при первом обращении; если
+в сериализаторе появилось поле, которого reader не знает, он
+откажется работать, а не отдаст другой ответ. Значения полей
+сериализатора (даты) форматируются методами to_representation тех же
+полей, поэтому JSON совпадает с ответом сериализатора байт в байт.
+
+Reader подключается к viewset через ReaderMixin и используется только
+для list и retrieve в JSON; запись и Browsable API идут через
+сериализаторы. Отключается настройкой COMPILED_READERS.
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers
+
+from reviews.models import Genre
+from .middleware import measure_serialization
+from .serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleReadSerializer
+)
+
+# Поля, у которых to_representation не меняет значение из базы.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+class ValuesReader:
+    """Собирает ответ сериализатора serializer_class из строк .values().
+
+    values — поля выборки; accessors — функции доступа для полей,
+    которые не берутся из строки напрямую; versions — пары
+    (pk, версия) для ETag, как в ConditionalGetMixin.get_versions.
+    """
+
+    serializer_class = None
+    values = ()
+    accessors = {}
+    versions = (('id', 'updated_at'),)
+
+    @classmethod
+    def get_compiled(cls):
+        # Поля сериализатора собираются один раз на класс reader.
+        if '_compiled' not in cls.__dict__:
+            cls._compiled = cls().compile()
+        return cls._compiled
+
+    def compile(self):
+        compiled = []
+        for name, field in self.serializer_class().fields.items():
+            if name in self.accessors:
+                compiled.append((name, self.accessors[name]))
+            elif field.source not in self.values:
+                raise ImproperlyConfigured(
+                    f'{type(self).__name__} не знает поле {name} '
+                    f'сериализатора {self.serializer_class.__name__}'
+                )
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                compiled.append((name, itemgetter(field.source)))
+            else:
+                compiled.append((name, self.formatter(
+                    field.source, field.to_representation
+                )))
+        return compiled
+
+    @staticmethod
+    def formatter(key, to_representation):
+        def get(row):
+            value = row[key]
+            return None if value is None else to_representation(value)
+        return get
+
+    def prepare(self, queryset):
+        return queryset.prefetch_related(None).values(*self.values)
+
+    def get_versions(self, row):
+        return [(row[pk], row[version]) for pk, version in self.versions]
+
+    def represent(self, rows, many=False):
+        compiled = self.get_compiled()
+        rows = list(rows) if many else [rows]
+        with measure_serialization():
+            self.prefetch(rows)
+            data = [
+                {name: get(row) for name, get in compiled}
+                for row in rows
+            ]
+        return data if many else data[0]
+
+    def prefetch(self, rows):
+        """Догружает данные для страницы строк одним запросом."""
+
+
+def get_rating(row):
+    if not row['rating_count']:
+        return None
+    return row['rating_sum'] // row['rating_count']
+
+
+def get_category(row):
+    if row['category_id'] is None:
+        return None
+    return {'name': row['category__name'], 'slug': row['category__slug']}
+
+
+class TitleReader(ValuesReader):
+    serializer_class = TitleReadSerializer
+    values = (
+        'id', 'name', 'year', 'description', 'category_id',
+        'category__name', 'category__slug', 'rating_sum', 'rating_count',
+        'updated_at',
+    )
+    accessors = {
+        'category': get_category,
+        'genre': itemgetter('genre'),
+        'rating': get_rating,
+    }
+
+    def prefetch(self, rows):
+        # Тот же запрос, что и prefetch_related('genre'), поэтому
+        # жанры идут в том же порядке.
+        genres = {}
+        if rows:
+            for title_id, _, name, slug in Genre.objects.filter(
+                title__in=[row['id'] for row in rows]
+            ).values_list('title', 'id', 'name', 'slug'):
+                genres.setdefault(title_id, []).append(
+                    {'name': name, 'slug': slug}
+                )
+        for row in rows:
+            row['genre'] = genres.get(row['id'], [])
+
+
+class ReviewReader(ValuesReader):
+    serializer_class = ReviewSerializer
+    values = (
+        'id', 'text', 'score', 'pub_date', 'updated_at', 'title_id',
+        'title__name', 'title__updated_at', 'author__username',
+    )
+    accessors = {
+        'title': itemgetter('title__name'),
+        'author': itemgetter('author__username'),
+    }
+    # В ответе выводится название произведения.
+    versions = (('id', 'updated_at'), ('title_id', 'title__updated_at'))
+
+
+class CommentReader(ValuesReader):
+    serializer_class = CommentSerializer
+    values = ('id', 'text', 'pub_date', 'updated_at', 'author__username')
+    accessors = {'author': itemgetter('author__username')}
+
+
+class ReaderMixin:
+    """Отдаёт list и retrieve через reader_class вместо сериализатора.
+    Ставится перед ConditionalGetMixin, хуки которого переопределяет.
+    """
+
+    reader_class = None
+
+    def get_reader(self):
+        if not settings.COMPILED_READERS or self.reader_class is None:
+            return None
+        return self.reader_class()
+
+    def get_read_queryset(self, queryset):
+        reader = self.get_reader()
+        if reader is None:
+            return super().get_read_queryset(queryset)
+        return reader.prepare(queryset)
+
+    def get_read_object(self):
+        if self.get_reader() is None:
+            return super().get_read_object()
+        queryset = self.get_read_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(self.request, row)
+        return row
+
+    def get_versions(self, instance):
+        reader = self.get_reader()
+        if reader is None:
+            return super().get_versions(instance)
+        return reader.get_versions(instance)
+
+    def represent(self, data, many=False):
+        reader = self.get_reader()
+        if reader is None:
+            return super().represent(data, many)
+        return reader.represent(data, many)
@@ -0,0 +1,178 @@
+"""Кеш готовых ответов публичных GET-эндпоинтов.
+
+Ключ ответа — ресурс, его поколение и полный URL с query string.
+Поколение — счётчик в том же кеше; любая запись в модели ресурса
+увеличивает его, и все старые ключи разом перестают использоваться,
+без поиска и удаления: они доживают свой RESPONSE_CACHE_TIMEOUT.
+
+Какие ресурсы зависят от какой модели, задаёт DEPENDENCIES: список
+произведений показывает названия категорий и жанров и рейтинг, поэтому
+изменения этих моделей и отзывов тоже сбрасывают кеш произведений.
+Записи через viewset и админку ловятся сигналами (api.signals);
+после bulk_create и QuerySet.update() нужно вызвать bump() самому.
+
+Промах пересчитывает один запрос (api.single_flight); остальные
+в это время получают устаревший ответ с X-Cache: STALE. Устаревшим
+ответ становится только по времени: после записи поколение меняется,
+и старые ответы больше не отдаются.
+
+Бэкенд — алиас RESPONSE_CACHE из CACHES: локальная память, файлы
+или Redis. Для нескольких воркеров кеш должен быть общим, иначе
+поколение меняется только в своём процессе.
+"""
+from hashlib import md5
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from . import metrics, single_flight
+from .conditional import is_not_modified
+
+GENERATION_KEY = 'response-generation:{}'
+RESPONSE_KEY = 'response:{}:{}:{}'
+CACHE_HEADER = 'X-Cache'
+# Заголовки, которые сохраняются вместе с телом ответа.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+DEPENDENCIES = {
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+    Category: ('categories', 'titles'),
+    Genre: ('genres', 'titles'),
+}
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+def get_generation(resource):
+    cache = get_cache()
+    key = GENERATION_KEY.format(resource)
+    generation = cache.get(key)
+    if generation is None:
+        # Начальное значение — текущее время: если счётчик вытеснят
+        # из кеша, новое поколение не совпадёт со старыми ключами.
+        cache.add(key, time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump(*resources):
+    """Делает устаревшими все закешированные ответы ресурсов."""
+    if settings.RESPONSE_CACHE is None:
+        return
+    cache = get_cache()
+    for resource in resources:
+        key = GENERATION_KEY.format(resource)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time_ns(), None)
+
+
+def bump_on_commit(model, using=None):
+    """Сбрасывает кеш ресурсов модели после фиксации транзакции,
+    чтобы параллельный запрос не закешировал старые данные
+    под новым поколением.
+    """
+    resources = DEPENDENCIES.get(model)
+    if resources:
+        transaction.on_commit(lambda: bump(*resources), using=using)
+
+
+class CachedResponseMixin:
+    """Кеширует ответы list и retrieve для анонимных JSON-запросов."""
+
+    response_cache_resource = None
+
+    def get_response_cache_key(self, request):
+        if (settings.RESPONSE_CACHE is None
+                or self.response_cache_resource is None
+                or request.user.is_authenticated
+                or request.accepted_renderer.format != 'json'):
+            return None
+        return RESPONSE_KEY.format(
+            self.response_cache_resource,
+            get_generation(self.response_cache_resource),
+            md5(request.build_absolute_uri().encode()).hexdigest()
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        cached, fresh = single_flight.get_entry(cache, key)
+        metrics.observe_cache('responses', fresh)
+        if fresh:
+            return self.cached_response(request, cached, 'HIT')
+
+        token = single_flight.acquire(cache, key)
+        if token is None:
+            return self.get_response_while_locked(
+                cache, key, cached, handler, request, *args, **kwargs
+            )
+        try:
+            response = handler(request, *args, **kwargs)
+        except Exception:
+            single_flight.release(cache, key, token)
+            raise
+        if response.status_code != 200:
+            single_flight.release(cache, key, token)
+            return response
+
+        def store(rendered):
+            try:
+                single_flight.set_entry(cache, key, (rendered.content, {
+                    header: rendered[header] for header in CACHED_HEADERS
+                    if header in rendered
+                }), settings.RESPONSE_CACHE_TIMEOUT,
+                    settings.RESPONSE_CACHE_STALE_TIMEOUT)
+            finally:
+                single_flight.release(cache, key, token)
+
+        response[CACHE_HEADER] = 'MISS'
+        response.add_post_render_callback(store)
+        return response
+
+    def get_response_while_locked(self, cache, key, cached, handler,
+                                  request, *args, **kwargs):
+        """Ответ, пока его пересчитывает другой запрос."""
+        if cached is not None:
+            single_flight.observe('responses', 'stale')
+            return self.cached_response(request, cached, 'STALE')
+        cached = single_flight.wait(cache, key)
+        if cached is not None:
+            single_flight.observe('responses', 'waited')
+            return self.cached_response(request, cached, 'HIT')
+        single_flight.observe('responses', 'timeout')
+        return handler(request, *args, **kwargs)
+
+    @staticmethod
+    def cached_response(request, cached, state):
+        content, headers = cached
+        # ETag сохранённого ответа верен, пока не сменилось поколение.
+        if 'ETag' in headers and is_not_modified(request, headers['ETag']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content)
+        for header, value in headers.items():
+            response[header] = value
+        response[CACHE_HEADER] = state
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -1,6 +1,8 @@
 import re
 
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 
 from rest_framework import serializers
@@ -22,49 +24,74 @@ from .constants import (
     MAX_CODE_LENGTH,
     USERNAME_SYMBOLS
 )
+from .confirmation import confirmation_codes
+from .middleware import TimedRepresentationMixin
 
 
-class SignUpSerializer(serializers.ModelSerializer):
+class SignUpSerializer(serializers.Serializer):
     """
     Сериализатор для регистрации пользователя в системе.
-    Производит валидацию полей email и username.
+    Формат полей проверяется без базы, а одним запросом выясняется,
+    новый ли это пользователь, повторный запрос кода или конфликт
+    с чужими username или email.
     """
 
-    class Meta:
-        model = User
-        fields = ('email', 'username')
+    email = serializers.EmailField(max_length=MAX_EMAIL_FIELD_LENGHT)
+    username = serializers.CharField(max_length=MAX_USERNAME_FIELD_LENGHT)
+
+    user_exists = False
 
     def validate_username(self, value):
-        if value in SYSTEM_USERNAME:
-            raise serializers.ValidationError(
-                f'Неподходящее имя {value}. Попробуйте выбрать другое.'
-            )
-        if len(value) > MAX_USERNAME_FIELD_LENGHT:
-            raise serializers.ValidationError(
-                f'Имя {value} превышает допустимую длину в '
-                f'{MAX_USERNAME_FIELD_LENGHT} символов'
-            )
         if not re.match(USERNAME_SYMBOLS, value):
             raise serializers.ValidationError(
                 f'Недопустимые символы в имени {value}'
             )
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError(
-                'Пользователь с таким именем уже зарегистрирован в системе'
-            )
         return value
 
-    def validate_email(self, value):
-        if len(value) > MAX_EMAIL_FIELD_LENGHT:
-            raise serializers.ValidationError(
-                f'Почта {value} превышает допустимую длину в '
-                f'{MAX_EMAIL_FIELD_LENGHT} символов'
+    def validate(self, data):
+        username, email = data['username'], data['email']
+        matches = list(
+            User.objects.filter(Q(username=username) | Q(email=email))
+            .values_list('username', 'email')[:2]
+        )
+        if (username, email) in matches:
+            self.user_exists = True
+            return data
+        errors = self.get_conflicts(username, email, matches)
+        if username in SYSTEM_USERNAME:
+            errors['username'] = (
+                f'Неподходящее имя {username}. Попробуйте выбрать другое.'
             )
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError(
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+    @staticmethod
+    def get_conflicts(username, email, matches):
+        errors = {}
+        if any(match[0] == username for match in matches):
+            errors['username'] = (
+                'Пользователь с таким именем уже зарегистрирован в системе'
+            )
+        if any(match[1] == email for match in matches):
+            errors['email'] = (
                 'Пользователь с такой почтой уже зарегистрирован в системе'
             )
-        return value
+        return errors
+
+    def create(self, validated_data):
+        try:
+            return User.objects.create(**validated_data)
+        except IntegrityError:
+            # Тот же username или email успели зарегистрировать
+            # параллельным запросом.
+            raise serializers.ValidationError(self.get_conflicts(
+                validated_data['username'], validated_data['email'],
+                User.objects.filter(
+                    Q(username=validated_data['username'])
+                    | Q(email=validated_data['email'])
+                ).values_list('username', 'email')[:2]
+            ))
 
 
 class TokenSerializer(serializers.Serializer):
@@ -83,16 +110,18 @@ class TokenSerializer(serializers.Serializer):
             f'Пользователь {value} не найден', code='user not found'
         )
 
-    def validate_confirmation_code(self, value):
-        session_code = self.context['request'].session.get(
-            'confirmation_code'
-        )
-        if value != session_code:
-            raise serializers.ValidationError('Неправильный код')
-        return value
+    def validate(self, data):
+        if not confirmation_codes.verify(
+            data['username'], data['confirmation_code']
+        ):
+            raise serializers.ValidationError(
+                {'confirmation_code': 'Неправильный код'}
+            )
+        return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedRepresentationMixin,
+                     serializers.ModelSerializer):
     """
     Сериализатор для эндпоинта users.
     Производит валидацию полей role и username.
@@ -117,7 +146,8 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin,
+                         serializers.ModelSerializer):
     """
     Сериализатор для модели Category.
     """
@@ -127,7 +157,8 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['name', 'slug']
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedRepresentationMixin,
+                      serializers.ModelSerializer):
     """
     Сериализатор для модели Genre.
     Аналогичен CategorySerializer.
@@ -138,10 +169,12 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedRepresentationMixin,
+                          serializers.ModelSerializer):
     """
     Сериализатор для чтения произведений (Title).
-    Включает вложенные данные для категории и жанров, а также рейтинг.
+    Включает вложенные данные для категории и жанров, а также рейтинг,
+    который хранится в самом произведении и не агрегируется при чтении.
     """
 
     category = CategorySerializer(read_only=True)
@@ -150,10 +183,11 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'updated_at')
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(TimedRepresentationMixin,
+                           serializers.ModelSerializer):
     """
     Сериализатор для создания и обновления произведений (Title).
     Использует slug-поля для категории и жанров.
@@ -168,10 +202,11 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'updated_at')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedRepresentationMixin,
+                       serializers.ModelSerializer):
     """
     Сериализатор для модели Review.
     Производит валидацию оценки и проверяет наличие
@@ -196,17 +231,18 @@ class ReviewSerializer(serializers.ModelSerializer):
         title_id = self.context.get('view').kwargs.get('title_id')
         title = get_object_or_404(Title, pk=title_id)
         if request.method == 'POST' and Review.objects.filter(
-            title=title, author=author
+            title=title, author_id=author.pk
         ).exists():
             raise ValidationError('Может существовать только один отзыв!')
         return data
 
     class Meta:
         model = Review
-        fields = '__all__'
+        exclude = ('updated_at',)
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedRepresentationMixin,
+                        serializers.ModelSerializer):
     """
     Сериализатор для модели Comment.
     Представляет автора комментария в виде username.
@@ -219,3 +255,27 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class ReviewSearchSerializer(ReviewSerializer):
+    """
+    Сериализатор отзыва в результатах поиска.
+    Дополнительно отдаёт id произведения.
+    """
+
+    title_id = serializers.IntegerField(read_only=True)
+
+
+class CommentSearchSerializer(CommentSerializer):
+    """
+    Сериализатор комментария в результатах поиска.
+    Дополнительно отдаёт id отзыва и произведения.
+    """
+
+    review_id = serializers.IntegerField(read_only=True)
+    title_id = serializers.IntegerField(
+        source='review.title_id', read_only=True
+    )
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review_id', 'title_id')
@@ -0,0 +1,48 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title, User
+from . import response_cache
+from .authentication import mark_claims_changed
+
+
+@receiver(post_save, sender=User)
+def track_claims_change(sender, instance, created, **kwargs):
+    """Отзывает claims выданных токенов, если изменились роль,
+    флаги или активность пользователя.
+    QuerySet.update() сигналов не вызывает.
+    """
+    claims = instance.get_claims()
+    if not created and getattr(instance, '_saved_claims', None) != claims:
+        mark_claims_changed(instance.pk)
+    instance._saved_claims = claims
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    mark_claims_changed(instance.pk)
+
+
+@receiver(post_save)
+def invalidate_saved_responses(sender, instance, created, using, **kwargs):
+    """Сбрасывает кеш ответов ресурсов, зависящих от модели.
+    Отзыв меняет произведение, только если меняется рейтинг.
+    """
+    if (sender is Review and not created
+            and getattr(instance, '_saved_score', None) == int(
+                instance.score)
+            and getattr(instance, '_saved_title_id', None) in (
+                None, instance.title_id)):
+        return
+    response_cache.bump_on_commit(sender, using)
+
+
+@receiver(post_delete)
+def invalidate_deleted_responses(sender, using, **kwargs):
+    response_cache.bump_on_commit(sender, using)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, using, **kwargs):
+    if action.startswith('post_'):
+        response_cache.bump_on_commit(sender, using)
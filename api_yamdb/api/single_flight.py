@@ -0,0 +1,93 @@
+"""Один пересчёт на промах кеша (single-flight) и отдача устаревших
+данных на время пересчёта (stale-while-revalidate).
+
+Значение хранится вместе со сроком свежести и живёт в кеше дольше
+него на stale_timeout. Когда срок вышел или значения нет, пересчёт
+достаётся тому, кто первым взял блокировку — ключ, добавленный
+cache.add() в тот же кеш. Остальные отдают устаревшее значение,
+а если его нет — ждут SINGLE_FLIGHT_WAIT секунд, пока значение
+появится, и только потом считают сами, не сохраняя результат.
+
+Блокировка живёт SINGLE_FLIGHT_LOCK_TIMEOUT секунд, поэтому упавший
+воркер не держит её вечно. Между процессами она работает через общий
+кеш; атомарный add есть у Redis и memcached, у файлового кеша
+изредка пересчитывают двое.
+"""
+from time import monotonic, sleep, time
+from uuid import uuid4
+
+from django.conf import settings
+
+from . import metrics
+
+LOCK_KEY = 'single-flight:{}'
+
+
+def get_entry(cache, key):
+    """Возвращает (значение, свежее ли оно) или (None, False)."""
+    entry = cache.get(key)
+    if entry is None:
+        return None, False
+    fresh_until, value = entry
+    return value, time() < fresh_until
+
+
+def set_entry(cache, key, value, timeout, stale_timeout):
+    cache.set(key, (time() + timeout, value), timeout + stale_timeout)
+
+
+def acquire(cache, key):
+    """Берёт блокировку пересчёта; возвращает токен или None."""
+    token = uuid4().hex
+    if cache.add(
+        LOCK_KEY.format(key), token, settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+    ):
+        return token
+    return None
+
+
+def release(cache, key, token):
+    # Чужую блокировку, взятую после истечения нашей, не снимаем.
+    lock_key = LOCK_KEY.format(key)
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def wait(cache, key):
+    """Ждёт, пока другой процесс сохранит значение."""
+    deadline = monotonic() + settings.SINGLE_FLIGHT_WAIT
+    while monotonic() < deadline:
+        sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+        value, _ = get_entry(cache, key)
+        if value is not None:
+            return value
+    return None
+
+
+def observe(cache_name, result):
+    metrics.inc('yamdb_single_flight_total', cache=cache_name, result=result)
+
+
+def get_or_set(cache, key, compute, timeout, stale_timeout, cache_name):
+    """Значение из кеша или compute(), посчитанное одним процессом."""
+    value, fresh = get_entry(cache, key)
+    metrics.observe_cache(cache_name, fresh)
+    if fresh:
+        return value
+    token = acquire(cache, key)
+    if token is None:
+        if value is not None:
+            observe(cache_name, 'stale')
+            return value
+        value = wait(cache, key)
+        if value is not None:
+            observe(cache_name, 'waited')
+            return value
+        observe(cache_name, 'timeout')
+        return compute()
+    try:
+        value = compute()
+        set_entry(cache, key, value, timeout, stale_timeout)
+    finally:
+        release(cache, key, token)
+    return value
@@ -0,0 +1,158 @@
+"""Ограничение частоты запросов со счётчиками в общем SQLite-файле.
+
+Стандартные троттлы DRF хранят список отметок времени в локальном
+кеше процесса: при N воркерах лимит фактически в N раз выше, а каждая
+проверка копирует список. Здесь на ключ хранится одна строка
+с двумя счётчиками — текущего и предыдущего окна, и число запросов
+за скользящее окно оценивается как
+previous * (доля предыдущего окна, ещё попадающая в интервал) + count.
+Проверка — один UPSERT, отказ — ещё один UPDATE.
+
+Файл THROTTLE_DB_PATH общий для всех воркеров на машине.
+"""
+import os
+import random
+import sqlite3
+import threading
+from time import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    UserRateThrottle
+)
+
+# Доля проверок, после которых удаляются устаревшие строки.
+CLEANUP_PROBABILITY = 0.001
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS throttle (
+        key TEXT PRIMARY KEY,
+        window INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        previous INTEGER NOT NULL,
+        expires REAL NOT NULL
+    ) WITHOUT ROWID
+'''
+HIT = '''
+    INSERT INTO throttle (key, window, count, previous, expires)
+    VALUES (?, ?, 1, 0, ?)
+    ON CONFLICT (key) DO UPDATE SET
+        previous = CASE
+            WHEN excluded.window = window THEN previous
+            WHEN excluded.window = window + 1 THEN count
+            ELSE 0
+        END,
+        count = CASE WHEN excluded.window = window THEN count + 1 ELSE 1 END,
+        window = excluded.window,
+        expires = excluded.expires
+    RETURNING count, previous
+'''
+UNDO = 'UPDATE throttle SET count = count - 1 WHERE key = ? AND window = ?'
+
+
+class SlidingWindowStore:
+    """Счётчики скользящего окна; соединение своё у каждого потока
+    и процесса.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def connect(self):
+        path = str(settings.THROTTLE_DB_PATH)
+        state = (os.getpid(), path)
+        if getattr(self.local, 'state', None) != state:
+            connection = sqlite3.connect(
+                path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(CREATE_TABLE)
+            self.local.connection = connection
+            self.local.state = state
+        return self.local.connection
+
+    def hit(self, key, limit, duration, now=None):
+        """Учитывает запрос. Возвращает (разрешён ли, сколько ждать)."""
+        now = time() if now is None else now
+        window, offset = divmod(now, duration)
+        window = int(window)
+        elapsed = offset / duration
+        connection = self.connect()
+        count, previous = connection.execute(
+            HIT, (key, window, (window + 2) * duration)
+        ).fetchone()
+        if random.random() < CLEANUP_PROBABILITY:
+            connection.execute(
+                'DELETE FROM throttle WHERE expires < ?', (now,)
+            )
+        if previous * (1 - elapsed) + count <= limit:
+            return True, None
+        connection.execute(UNDO, (key, window))
+        return False, self.wait(count - 1, previous, limit, elapsed, duration)
+
+    @staticmethod
+    def wait(count, previous, limit, elapsed, duration):
+        """Через сколько секунд оценка опустится ниже лимита."""
+        if count < limit and previous:
+            needed = 1 - (limit - count - 1) / previous
+            return max(0, needed - elapsed) * duration
+        # В текущем окне места нет: ждём следующего, где текущие
+        # запросы станут предыдущими.
+        needed = 1 - (limit - 1) / count if count else 0
+        return (1 - elapsed + max(0, needed)) * duration
+
+    def clear(self):
+        self.connect().execute('DELETE FROM throttle')
+
+
+store = SlidingWindowStore()
+
+
+class SlidingWindowThrottleMixin:
+    """Заменяет хранение истории в кеше на SlidingWindowStore."""
+
+    def get_rate(self):
+        # Лимиты читаются при каждой проверке, а не при импорте.
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self.wait_seconds = store.hit(
+            self.key, self.num_requests, self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottleMixin,
+                                AnonRateThrottle):
+    """Лимит для анонимных запросов по IP."""
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottleMixin,
+                                UserRateThrottle):
+    """Лимит для пользователей по id, для анонимных — по IP."""
+
+
+class ScopedSlidingWindowThrottle(SlidingWindowThrottleMixin,
+                                  ScopedRateThrottle):
+    """Лимит для представлений с атрибутом throttle_scope."""
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
@@ -7,6 +7,7 @@ from .views import (
     CommentsViewSet,
     GenreViewSet,
     ReviewsViewSet,
+    SearchView,
     SignUpView,
     TokenView,
     TitleViewSet,
@@ -32,4 +33,5 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SignUpView.as_view(), name='signup'),
     path('v1/auth/token/', TokenView.as_view(), name='token'),
+    path('v1/search/', SearchView.as_view(), name='search'),
 ]
@@ -1,10 +1,10 @@
-from random import choice
+from secrets import choice
 from string import digits
 
-from django.core.mail import send_mail
 from django.conf import settings
 
 from .constants import SUBJECT
+from .mail_queue import enqueue_mail
 
 
 def generate_confirmation_code():
@@ -16,4 +16,4 @@ def send_confirmation_code(email, confirmation_code):
     message = f'Код подтверждения: {confirmation_code}'
     from_email = settings.EMAIL_HOST_USER
     recipient_list = (email,)
-    send_mail(subject, message, from_email, recipient_list)
+    enqueue_mail(subject, message, from_email, recipient_list)
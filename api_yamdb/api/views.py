@@ -1,5 +1,5 @@
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import (
@@ -15,7 +15,6 @@ from rest_framework.permissions import (
     IsAuthenticated, IsAuthenticatedOrReadOnly
 )
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
 from reviews.models import (
     Category,
@@ -24,16 +23,30 @@ from reviews.models import (
     Review,
     Title,
     User)
+from reviews.search import search_queryset
+from . import metrics
+from .authentication import ClaimsAccessToken
+from .conditional import ConditionalGetMixin
+from .confirmation import confirmation_codes
+from .constants import MAX_SEARCH_RESULTS_LIMIT, SEARCH_RESULTS_LIMIT
 from .permissions import (
     IsAdminIsModeratorIsAuthorOrReadOnly,
     IsAdminOrReadOnly,
     IsAdmin
 )
-from .filters import TitleFilter
+from .filters import FullTextSearchFilter, TitleFilter
+from .pagination import (
+    OptionalCountPagination,
+    PageNumberOrKeysetPagination
+)
+from .readers import CommentReader, ReaderMixin, ReviewReader, TitleReader
+from .response_cache import CachedResponseMixin
 from .serializers import (
     CategorySerializer,
+    CommentSearchSerializer,
     CommentSerializer,
     GenreSerializer,
+    ReviewSearchSerializer,
     ReviewSerializer,
     SignUpSerializer,
     TokenSerializer,
@@ -41,7 +54,7 @@ from .serializers import (
     TitleWriteSerializer,
     UserSerializer
 )
-from .utils import generate_confirmation_code, send_confirmation_code
+from .utils import send_confirmation_code
 
 
 class SignUpView(generics.CreateAPIView):
@@ -51,22 +64,20 @@ class SignUpView(generics.CreateAPIView):
 
     serializer_class = SignUpSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'signup'
 
     def post(self, request):
-        email = request.data.get('email')
-        username = request.data.get('username')
         serializer = SignUpSerializer(data=request.data)
-
-        if (User.objects.filter(username=username, email=email).exists()
-                or serializer.is_valid()):
-            confirmation_code = generate_confirmation_code()
-            request.session['confirmation_code'] = confirmation_code
-            send_confirmation_code(email, confirmation_code)
-            if serializer.is_valid():
-                serializer.save()
-            return Response({'email': email, 'username': username},
-                            status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.is_valid(raise_exception=True)
+        if not serializer.user_exists:
+            serializer.save()
+        data = serializer.validated_data
+        confirmation_code = confirmation_codes.issue(data['username'])
+        send_confirmation_code(data['email'], confirmation_code)
+        return Response(
+            {'email': data['email'], 'username': data['username']},
+            status=status.HTTP_200_OK
+        )
 
 
 class TokenView(views.APIView):
@@ -76,6 +87,7 @@ class TokenView(views.APIView):
 
     serializer_class = TokenSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data,
@@ -83,7 +95,7 @@ class TokenView(views.APIView):
         if serializer.is_valid():
             username = serializer.validated_data['username']
             user = User.objects.get(username=username)
-            token = AccessToken.for_user(user)
+            token = ClaimsAccessToken.for_user(user)
             return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
         errors = serializer.errors
@@ -93,6 +105,61 @@ class TokenView(views.APIView):
         return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class SearchView(views.APIView):
+    """
+    APIView для полнотекстового поиска по произведениям,
+    отзывам и комментариям.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        try:
+            limit = min(
+                int(request.query_params.get('limit', SEARCH_RESULTS_LIMIT)),
+                MAX_SEARCH_RESULTS_LIMIT
+            )
+        except ValueError:
+            limit = SEARCH_RESULTS_LIMIT
+        if not text or limit < 1:
+            return Response(
+                {'q': 'Укажите поисковый запрос.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        titles = search_queryset(
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ), text
+        )[:limit]
+        reviews = search_queryset(
+            Review.objects.select_related('title', 'author'), text
+        )[:limit]
+        comments = search_queryset(
+            Comment.objects.select_related('review', 'author'), text
+        )[:limit]
+        context = {'request': request}
+        return Response({
+            'titles': TitleReadSerializer(
+                titles, many=True, context=context
+            ).data,
+            'reviews': ReviewSearchSerializer(
+                reviews, many=True, context=context
+            ).data,
+            'comments': CommentSearchSerializer(
+                comments, many=True, context=context
+            ).data,
+        })
+
+
+def metrics_view(request):
+    """
+    Метрики всех процессов в формате экспозиции Prometheus.
+    """
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     ViewSet для работы с моделью User.
@@ -101,6 +168,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
+    pagination_class = OptionalCountPagination
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
     filter_backends = (filters.SearchFilter,)
@@ -109,19 +177,22 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'patch'],
             permission_classes=(IsAuthenticated,))
     def me(self, request):
+        # В request.user может быть пользователь из claims токена,
+        # профиль берётся из базы.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = self.get_serializer(instance=request.user)
+            serializer = self.get_serializer(instance=user)
             return Response(serializer.data)
 
         serializer = self.get_serializer(
-            data=request.data, instance=request.user, partial=True
+            data=request.data, instance=user, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
 
 
-class BaseCategoryGenreViewSet(viewsets.ModelViewSet):
+class BaseCategoryGenreViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """
     Базовый ViewSet для управления категориями и жанрами.
     """
@@ -141,6 +212,7 @@ class CategoryViewSet(BaseCategoryGenreViewSet):
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    response_cache_resource = 'categories'
 
 
 class GenreViewSet(BaseCategoryGenreViewSet):
@@ -149,18 +221,25 @@ class GenreViewSet(BaseCategoryGenreViewSet):
     """
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    response_cache_resource = 'genres'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedResponseMixin, ReaderMixin, ConditionalGetMixin,
+                   viewsets.ModelViewSet):
     """
     ViewSet для работы с произведениями (Title).
     """
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score')).all()
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = OptionalCountPagination
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
+    response_cache_resource = 'titles'
+    reader_class = TitleReader
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
@@ -168,22 +247,33 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleWriteSerializer
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(ReaderMixin, ConditionalGetMixin,
+                     viewsets.ModelViewSet):
     """
     ViewSet для управления отзывами.
     """
 
-    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAdminIsModeratorIsAuthorOrReadOnly
     )
+    pagination_class = PageNumberOrKeysetPagination
+    filter_backends = (FullTextSearchFilter,)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    # В ответе выводится название произведения.
+    version_related = ('title',)
+    reader_class = ReviewReader
+
+    def get_title(self):
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+
+    def get_queryset(self):
+        # Отзывы выбираются по индексу (title, -pub_date, -score),
+        # произведение берётся из менеджера связи, автор — через JOIN.
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user, title_id=self.kwargs.get('title_id')
-        )
+        serializer.save(author_id=self.request.user.pk, title=self.get_title())
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -191,18 +281,34 @@ class ReviewsViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(ReaderMixin, ConditionalGetMixin,
+                      viewsets.ModelViewSet):
     """
     ViewSet для управления комментариями к отзывам.
     """
 
-    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAdminIsModeratorIsAuthorOrReadOnly
     )
+    pagination_class = PageNumberOrKeysetPagination
+    filter_backends = (FullTextSearchFilter,)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    reader_class = CommentReader
+
+    def get_review(self):
+        return get_object_or_404(
+            Review,
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id')
+        )
+
+    def get_queryset(self):
+        # Комментарии выбираются по индексу (review, -pub_date),
+        # автор подтягивается через JOIN.
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author_id=self.request.user.pk, review=self.get_review()
+        )
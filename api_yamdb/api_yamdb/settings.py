@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from datetime import timedelta
+from tempfile import gettempdir
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -30,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -114,22 +117,107 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+    # JSON через orjson, если он установлен (api.renderers).
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
 
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle',
+        'api.throttling.UserSlidingWindowThrottle',
+        'api.throttling.AnonSlidingWindowThrottle',
+        'api.throttling.ScopedSlidingWindowThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'user': '10000/day',
         'anon': '1000/day',
+        'signup': '20/hour',
+        'token': '60/hour',
     },
 
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кеш ответов api.response_cache, его поколения и блокировки
+    # пересчёта. Должен быть общим для всех воркеров: файлы или Redis
+    # (django_redis.cache.RedisCache, LOCATION 'redis://127.0.0.1:6379/1').
+    # LocMemCache годится только для одного процесса.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(gettempdir()) / 'api_yamdb_responses',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Общий для всех воркеров кеш данных, которые нельзя терять
+    # между процессами: отзыв claims токенов и коды подтверждения.
+    # Можно заменить на Redis.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(gettempdir()) / 'api_yamdb_cache',
+        # Вытеснение записи об отзыве вернуло бы токену старые права.
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+# Кеш, в котором api.authentication отмечает смену роли пользователя.
+CLAIMS_CHANGED_CACHE = 'shared'
+
+# Алиас кеша ответов (None — кеш выключен) и время жизни ответа;
+# после записи в модель ответ сбрасывается сразу через поколение.
+RESPONSE_CACHE = 'responses'
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+# Сколько ещё отдавать устаревший ответ, пока другой воркер его
+# пересчитывает.
+RESPONSE_CACHE_STALE_TIMEOUT = 60
+
+# api.single_flight: срок блокировки пересчёта, сколько ждать чужого
+# пересчёта при пустом кеше и как часто проверять результат.
+SINGLE_FLIGHT_LOCK_TIMEOUT = 10
+SINGLE_FLIGHT_WAIT = 0.5
+SINGLE_FLIGHT_POLL_INTERVAL = 0.02
+
+# Общий для воркеров файл счётчиков api.throttling.
+THROTTLE_DB_PATH = Path(gettempdir()) / 'api_yamdb_throttle.sqlite3'
+
+# Режим подсчёта записей для OptionalCountPagination: exact, cached, none.
+PAGINATION_COUNT_MODE = 'exact'
+# Алиас кеша для режима cached; общий для воркеров, как и кеш ответов,
+# иначе каждый воркер пересчитывает COUNT(*) сам.
+PAGINATION_COUNT_CACHE = 'responses'
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+PAGINATION_COUNT_STALE_TIMEOUT = 5 * 60
+PAGINATION_MAX_PAGE_SIZE = 100
+
+# list и retrieve произведений, отзывов и комментариев собираются
+# из .values() без ModelSerializer (api.readers).
+COMPILED_READERS = True
+
+# Лимит SQL-запросов на один запрос для api.middleware.PerformanceMiddleware.
+# Сам middleware подключается добавлением в MIDDLEWARE.
+PERFORMANCE_QUERY_BUDGET = 10
+
+# Файлы метрик процессов для /metrics; каталог общий для всех воркеров
+# и очищается при деплое.
+METRICS_DIR = Path(gettempdir()) / 'api_yamdb_metrics'
+METRICS_FLUSH_INTERVAL = 1
+
+# Профилирование: доля запросов (0 — только по заголовку X-Profile или
+# ?profile=1 от администратора), маршруты для выборки (пусто — все)
+# и каталог pstats-файлов для команды profile_report.
+PROFILER_SAMPLE_RATE = 0
+PROFILER_ROUTES = ()
+PROFILER_DIR = Path(gettempdir()) / 'api_yamdb_profiles'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -143,5 +231,27 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 EMAIL_HOST_USER = 'support_yamdb@yandex.ru'
 
+# Очередь писем: run_mail_worker отправляет письма пачками и повторяет
+# неудачные с экспоненциальной задержкой. В режиме EAGER письмо
+# отправляется сразу в запросе, как раньше.
+EMAIL_QUEUE_EAGER = False
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_POLL_INTERVAL = 1
+EMAIL_QUEUE_LEASE = 300
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 30
+EMAIL_QUEUE_MAX_RETRY_DELAY = 3600
+# Текст отправленного письма стирается (в нём код подтверждения),
+# а сами строки run_mail_worker удаляет через EMAIL_QUEUE_RETENTION
+# секунд, проверяя раз в EMAIL_QUEUE_PURGE_INTERVAL секунд.
+EMAIL_QUEUE_RETENTION = 7 * 24 * 3600
+EMAIL_QUEUE_PURGE_INTERVAL = 3600
+
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+# Коды подтверждения хранятся в общем кеше, а не в сессии: регистрация
+# и получение токена могут попасть в разные воркеры.
+CONFIRMATION_CODE_CACHE = 'shared'
+CONFIRMATION_CODE_TIMEOUT = 15 * 60
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
 SESSION_COOKIE_SECURE = True
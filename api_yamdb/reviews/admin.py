@@ -4,6 +4,7 @@ from reviews.models import (Category,
                             Comment,
                             Genre,
                             GenreTitle,
+                            OutgoingEmail,
                             Review,
                             Title,
                             User)
@@ -43,6 +44,24 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('text', 'author')
 
 
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Класс настройки административной панели для очереди писем."""
+
+    list_display = (
+        'subject',
+        'to',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at'
+    )
+    list_filter = ('status',)
+    search_fields = ('to',)
+    # В тексте письма код подтверждения.
+    exclude = ('body',)
+
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     """Класс настройки административной панели для модели Review."""
@@ -1,7 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'рецензии'
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.restore_search_index, sender=self)
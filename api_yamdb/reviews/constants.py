@@ -8,3 +8,6 @@ MAX_NAME_LENGTH = 256
 MAX_SLUG_FIELD_LENGTH = 50
 MIN_REVIEW_SCORE = 1
 MAX_REVIEW_SCORE = 10
+MAX_EMAIL_SUBJECT_LENGTH = 255
+MAX_LEASE_FIELD_LENGTH = 32
+MAX_STATUS_FIELD_LENGTH = 10
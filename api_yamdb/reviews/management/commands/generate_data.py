@@ -0,0 +1,268 @@
+import multiprocessing
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from math import log
+from time import monotonic
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+
+from reviews.management.utils import keep_auto_now_add, reset_sequences
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User
+)
+
+# Оценки смещены к высоким, как в реальных рейтингах.
+SCORE_WEIGHTS = (1, 1, 2, 2, 4, 6, 10, 14, 12, 8)
+FIRST_PUB_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+PUB_DATE_SPAN = 10 * 365 * 24 * 3600
+
+
+def zipf_counts(rng, total, size, exponent, cap):
+    """Делит total между size элементами по закону Ципфа.
+    Первый элемент самый популярный; ни один не превышает cap.
+    Дробные доли округляются случайно, чтобы сумма была близка к total.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = []
+    for weight in weights:
+        share = weight * scale
+        counts.append(min(cap, int(share) + (rng.random() < share % 1)))
+    return counts
+
+
+def geometric(rng, mean, cap):
+    """Длина ветки комментариев с заданным средним, не больше cap."""
+    if mean <= 0:
+        return 0
+    p = 1 / (1 + mean)
+    return min(cap, int(log(1 - rng.random()) / log(1 - p)))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def generate_reviews_chunk(task):
+    """Готовит строки отзывов и комментариев для группы произведений.
+    Случайность привязана к id произведения, поэтому результат
+    не зависит от числа процессов. В базу пишет только основной процесс:
+    SQLite не допускает параллельной записи.
+    """
+    seed, titles, first_user, last_user, comments_mean, max_depth = task
+    reviews, comments = [], []
+    for title_id, review_id, count in titles:
+        rng = random.Random(f'{seed}:{title_id}')
+        authors = rng.sample(range(first_user, last_user + 1), count)
+        for author_id in authors:
+            pub_date = FIRST_PUB_DATE + timedelta(
+                seconds=rng.randrange(PUB_DATE_SPAN)
+            )
+            score = rng.choices(range(1, 11), SCORE_WEIGHTS)[0]
+            reviews.append(
+                (review_id, title_id, author_id, score, pub_date)
+            )
+            for _ in range(geometric(rng, comments_mean, max_depth)):
+                pub_date += timedelta(seconds=rng.randrange(1, 86400))
+                comments.append(
+                    (review_id, rng.randint(first_user, last_user), pub_date)
+                )
+            review_id += 1
+    return reviews, comments
+
+
+class Command(BaseCommand):
+    """Генерирует большой воспроизводимый набор данных
+    для нагрузочного тестирования.
+    """
+
+    help = ('Создаёт пользователей, произведения, отзывы и комментарии '
+            'с реалистичным распределением.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument(
+            '--reviews', type=int, default=10000,
+            help='Примерное общее число отзывов.'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=20000,
+            help='Примерное общее число комментариев.'
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель закона Ципфа для популярности произведений.'
+        )
+        parser.add_argument(
+            '--max-comment-depth', type=int, default=100,
+            help='Наибольшее число комментариев к одному отзыву.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов для отзывов и комментариев.'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'titles', 'categories', 'genres',
+                     'batch_size', 'workers'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} должен '
+                                   'быть положительным')
+        started = monotonic()
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+
+        users = self.create_users(options['users'], batch_size)
+        categories = self.create_named(
+            Category, 'Категория', options['categories']
+        )
+        genres = self.create_named(Genre, 'Жанр', options['genres'])
+        titles = self.create_titles(
+            rng, options['titles'], categories, genres, batch_size
+        )
+
+        counts = zipf_counts(
+            rng, options['reviews'], len(titles), options['zipf'], len(users)
+        )
+        rng.shuffle(counts)
+        offsets = accumulate([self.next_id(Review)] + counts[:-1])
+        plan = [
+            (title_id, offset, count)
+            for title_id, offset, count in zip(titles, offsets, counts)
+            if count
+        ]
+        total_reviews = sum(counts)
+        comments_mean = (
+            options['comments'] / total_reviews if total_reviews else 0
+        )
+        tasks = (
+            (options['seed'], chunk, users[0], users[-1], comments_mean,
+             options['max_comment_depth'])
+            for chunk in self.split_plan(plan, batch_size)
+        )
+
+        with keep_auto_now_add(Review), keep_auto_now_add(Comment):
+            if options['workers'] == 1:
+                chunks = map(generate_reviews_chunk, tasks)
+                reviews, comments = self.write_chunks(chunks, batch_size)
+            else:
+                connections.close_all()
+                context = multiprocessing.get_context('fork')
+                with context.Pool(options['workers']) as pool:
+                    chunks = pool.imap(generate_reviews_chunk, tasks)
+                    reviews, comments = self.write_chunks(
+                        chunks, batch_size
+                    )
+
+        reset_sequences([User, Category, Genre, Title, Review, Comment])
+        call_command('rebuild_ratings', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, произведений '
+            f'{len(titles)}, отзывов {reviews}, комментариев {comments} '
+            f'за {monotonic() - started:.1f} с'
+        ))
+
+    @staticmethod
+    def split_plan(plan, batch_size):
+        """Группирует произведения так, чтобы в группе было
+        около batch_size отзывов.
+        """
+        chunk, size = [], 0
+        for item in plan:
+            chunk.append(item)
+            size += item[2]
+            if size >= batch_size:
+                yield chunk
+                chunk, size = [], 0
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def write_chunks(chunks, batch_size):
+        total_reviews = total_comments = 0
+        for reviews, comments in chunks:
+            Review.objects.bulk_create(
+                (Review(id=review_id, title_id=title_id, author_id=author_id,
+                        score=score, pub_date=pub_date,
+                        text=f'Отзыв {review_id} на произведение {title_id}')
+                 for review_id, title_id, author_id, score, pub_date
+                 in reviews),
+                batch_size=batch_size
+            )
+            Comment.objects.bulk_create(
+                (Comment(review_id=review_id, author_id=author_id,
+                         pub_date=pub_date,
+                         text=f'Комментарий к отзыву {review_id}')
+                 for review_id, author_id, pub_date in comments),
+                batch_size=batch_size
+            )
+            total_reviews += len(reviews)
+            total_comments += len(comments)
+        return total_reviews, total_comments
+
+    @staticmethod
+    def next_id(model):
+        return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    def create_users(self, count, batch_size):
+        first = self.next_id(User)
+        ids = range(first, first + count)
+        password = make_password(None)
+        for batch in batched(ids, batch_size):
+            User.objects.bulk_create(
+                User(id=user_id, username=f'user{user_id}',
+                     email=f'user{user_id}@yamdb.fake', password=password)
+                for user_id in batch
+            )
+        return ids
+
+    def create_named(self, model, name, count):
+        first = self.next_id(model)
+        ids = range(first, first + count)
+        model.objects.bulk_create(
+            model(id=obj_id, name=f'{name} {obj_id}',
+                  slug=f'{model._meta.model_name}-{obj_id}')
+            for obj_id in ids
+        )
+        return ids
+
+    def create_titles(self, rng, count, categories, genres, batch_size):
+        first = self.next_id(Title)
+        ids = range(first, first + count)
+        for batch in batched(ids, batch_size):
+            Title.objects.bulk_create(
+                Title(id=title_id, name=f'Произведение {title_id}',
+                      year=rng.randint(1900, 2024),
+                      category_id=rng.choice(categories),
+                      description=f'Описание произведения {title_id}')
+                for title_id in batch
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title_id=title_id, genre_id=genre_id)
+                for title_id in batch
+                for genre_id in rng.sample(
+                    genres, min(len(genres), rng.randint(1, 3))
+                )
+            )
+        return ids
@@ -0,0 +1,134 @@
+import csv
+from itertools import islice
+from pathlib import Path
+from time import monotonic
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews.management.utils import keep_auto_now_add, reset_sequences
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User
+)
+from reviews.signals import touch_titles
+
+DEFAULT_DATA_DIR = Path(settings.BASE_DIR) / 'static' / 'data'
+DEFAULT_BATCH_SIZE = 1000
+
+
+def parse_user(row):
+    row['password'] = make_password(None)
+    return row
+
+
+def parse_pub_date(row):
+    row['pub_date'] = parse_datetime(row['pub_date'])
+    return row
+
+
+# Файлы в порядке зависимостей: (файл, модель, переименование колонок,
+# дополнительная обработка строки).
+IMPORT_PLAN = (
+    ('users.csv', User, {}, parse_user),
+    ('category.csv', Category, {}, None),
+    ('genre.csv', Genre, {}, None),
+    ('titles.csv', Title, {'category': 'category_id'}, None),
+    ('genre_title.csv', GenreTitle, {}, None),
+    ('review.csv', Review, {'author': 'author_id'}, parse_pub_date),
+    ('comments.csv', Comment, {'author': 'author_id'}, parse_pub_date),
+)
+
+
+class Command(BaseCommand):
+    """Загружает данные из static/data/*.csv пакетами через bulk_create.
+    Файлы читаются потоково, поэтому память не зависит от их размера.
+    """
+
+    help = 'Импортирует CSV-файлы из static/data в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=DEFAULT_DATA_DIR,
+            type=Path,
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            default=DEFAULT_BATCH_SIZE,
+            type=int,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать строки, которые уже есть в базе.'
+        )
+
+    def handle(self, *args, **options):
+        data_dir = options['path']
+        if not data_dir.is_dir():
+            raise CommandError(f'Каталог {data_dir} не найден')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+
+        for filename, model, renames, parse in IMPORT_PLAN:
+            path = data_dir / filename
+            if not path.exists():
+                self.stdout.write(self.style.WARNING(
+                    f'{filename}: файл не найден, пропущен'
+                ))
+                continue
+            started = monotonic()
+            with transaction.atomic(), keep_auto_now_add(model):
+                rows = self.import_file(
+                    path, model, renames, parse,
+                    options['batch_size'], options['ignore_conflicts']
+                )
+            if model is GenreTitle and rows:
+                # bulk_create не вызывает сигналов, а жанры могли
+                # добавиться и к уже загруженным произведениям.
+                touch_titles(GenreTitle.objects.values('title'))
+            elapsed = monotonic() - started
+            self.stdout.write(
+                f'{filename}: {rows} строк за {elapsed:.2f} с '
+                f'({rows / elapsed if elapsed else rows:.0f} строк/с)'
+            )
+
+        reset_sequences([model for _, model, _, _ in IMPORT_PLAN])
+        call_command('rebuild_ratings', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Импорт завершён'))
+
+    def import_file(self, path, model, renames, parse, batch_size,
+                    ignore_conflicts):
+        total = 0
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            objects = (
+                model(**self.prepare_row(row, renames, parse))
+                for row in reader
+            )
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    return total
+                model.objects.bulk_create(
+                    batch, batch_size=batch_size,
+                    ignore_conflicts=ignore_conflicts
+                )
+                total += len(batch)
+
+    @staticmethod
+    def prepare_row(row, renames, parse):
+        row = {renames.get(key, key): value for key, value in row.items()}
+        return parse(row) if parse else row
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    """Пересчитывает счётчики рейтинга произведений по таблице отзывов."""
+
+    help = ('Пересчитывает rating_sum/rating_count у произведений. '
+            'С флагом --check только сверяет значения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            totals = {
+                row['title_id']: (row['score_sum'], row['score_count'])
+                for row in Review.objects.order_by().values(
+                    'title_id'
+                ).annotate(score_sum=Sum('score'), score_count=Count('id'))
+            }
+            broken = []
+            now = timezone.now()
+            for title in Title.objects.only(
+                'id', 'rating_sum', 'rating_count'
+            ).select_for_update().iterator():
+                expected = totals.get(title.id, (0, 0))
+                if (title.rating_sum, title.rating_count) != expected:
+                    title.rating_sum, title.rating_count = expected
+                    title.updated_at = now
+                    broken.append(title)
+            if not options['check']:
+                Title.objects.bulk_update(
+                    broken, ('rating_sum', 'rating_count', 'updated_at'),
+                    batch_size=500
+                )
+
+        if options['check'] and broken:
+            raise CommandError(
+                f'Счётчики рейтинга расходятся у {len(broken)} произведений: '
+                + ', '.join(str(title.id) for title in broken[:20])
+            )
+        action = 'Найдено' if options['check'] else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} расхождений: {len(broken)}'
+        ))
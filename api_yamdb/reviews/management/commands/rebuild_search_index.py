@@ -0,0 +1,27 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+
+from reviews.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Перестраивает полнотекстовый индекс по произведениям,
+    отзывам и комментариям.
+    """
+
+    help = 'Перестраивает полнотекстовый поисковый индекс.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Алиас базы данных.'
+        )
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        rebuild_search_index(options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Поисковый индекс перестроен за {monotonic() - started:.2f} с'
+        ))
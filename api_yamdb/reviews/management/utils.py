@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Позволяет сохранить переданную дату: bulk_create
+    иначе перезаписывает поля с auto_now_add текущим временем.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(models):
+    """Сдвигает счётчики первичных ключей за максимальный id:
+    после bulk_create с явными id база (например, PostgreSQL)
+    иначе выдала бы новым записям уже занятые ключи.
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
@@ -0,0 +1,27 @@
+# Generated by Django 3.2 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_comment_review_pub_date_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='name',
+            field=models.CharField(db_index=True, max_length=256, verbose_name='Название'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.PositiveIntegerField(db_index=True, verbose_name='Год выпуска'),
+        ),
+        migrations.AddIndex(
+            model_name='genretitle',
+            index=models.Index(fields=['genre', 'title'], name='genretitle_genre_title_idx'),
+        ),
+    ]
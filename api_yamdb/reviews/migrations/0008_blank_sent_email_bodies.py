@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def blank_sent_bodies(apps, schema_editor):
+    # В текстах писем лежат коды подтверждения.
+    OutgoingEmail = apps.get_model('reviews', 'OutgoingEmail')
+    OutgoingEmail.objects.exclude(status='pending').update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_sent_bodies, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 from .constants import (
     MAX_USERNAME_FIELD_LENGHT,
@@ -13,7 +15,10 @@ from .constants import (
     MAX_SLUG_FIELD_LENGTH,
     MIN_REVIEW_SCORE,
     MAX_REVIEW_SCORE,
-    MAX_FIELD_LENGHT_STR
+    MAX_FIELD_LENGHT_STR,
+    MAX_EMAIL_SUBJECT_LENGTH,
+    MAX_LEASE_FIELD_LENGTH,
+    MAX_STATUS_FIELD_LENGTH
 )
 
 
@@ -64,6 +69,37 @@ class CustomUser(AbstractUser):
     def is_moderator(self):
         return self.role == self.RoleChoices.MODERATOR
 
+    # Поля, от которых зависят права; они же передаются в claims токена.
+    CLAIM_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_claims = tuple(
+            instance.__dict__.get(field) for field in cls.CLAIM_FIELDS
+        )
+        instance._saved_username = instance.__dict__.get('username')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет пользователя; при смене имени в той же транзакции
+        обновляет updated_at его отзывов и комментариев, в ответах
+        которых это имя выводится.
+        """
+        saved_username = getattr(self, '_saved_username', None)
+        if saved_username is None or saved_username == self.username:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                now = timezone.now()
+                Review.objects.filter(author=self).update(updated_at=now)
+                Comment.objects.filter(author=self).update(updated_at=now)
+        self._saved_username = self.username
+
+    def get_claims(self):
+        return tuple(getattr(self, field) for field in self.CLAIM_FIELDS)
+
     def __str__(self):
         return self.username
 
@@ -116,9 +152,10 @@ class Title(models.Model):
 
     name = models.CharField(
         'Название',
-        max_length=MAX_NAME_LENGTH
+        max_length=MAX_NAME_LENGTH,
+        db_index=True
     )
-    year = models.PositiveIntegerField('Год выпуска')
+    year = models.PositiveIntegerField('Год выпуска', db_index=True)
     description = models.TextField('Описание', blank=True, null=True)
     category = models.ForeignKey(
         Category,
@@ -132,6 +169,35 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='Жанры'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    # Меняется при любом изменении ответа: своих полей, рейтинга,
+    # категории и жанров. По нему считаются ETag и Last-Modified.
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    @property
+    def rating(self):
+        """Средняя оценка, округлённая вниз, или None без отзывов."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+    @classmethod
+    def change_rating(cls, title_id, score_delta, count_delta=0):
+        """Атомарно сдвигает счётчики рейтинга произведения."""
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta,
+            updated_at=timezone.now()
+        )
 
     def __str__(self):
         return self.name
@@ -163,9 +229,21 @@ class GenreTitle(models.Model):
                 name='unique_title_genre'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='genretitle_genre_title_idx'
+            )
+        ]
         verbose_name = 'Жанр произведения'
         verbose_name_plural = 'Жанры произведений'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_title_id = instance.__dict__.get('title_id')
+        return instance
+
     def __str__(self):
         return f'{self.title} — {self.genre}'
 
@@ -192,6 +270,7 @@ class Review(models.Model):
                     MaxValueValidator(MAX_REVIEW_SCORE)]
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         constraints = [
@@ -200,10 +279,64 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-score'],
+                name='review_title_pub_date_idx'
+            )
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('-pub_date', '-score',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_score = instance.__dict__.get('score')
+        instance._saved_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и в той же транзакции обновляет
+        счётчики рейтинга произведения, а при переносе отзыва
+        к другому произведению — счётчики обоих.
+        Прежние оценка и произведение читаются из базы с блокировкой
+        строки: загруженный раньше экземпляр мог устареть, и два
+        параллельных изменения посчитали бы сдвиг от одной оценки.
+        """
+        update_fields = kwargs.get('update_fields')
+        rated = update_fields is None or bool(
+            {'score', 'title', 'title_id'} & set(update_fields)
+        )
+        with transaction.atomic():
+            saved = None
+            if not self._state.adding and rated:
+                saved = Review.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('score', 'title_id').first()
+                if saved is not None:
+                    self._saved_score, self._saved_title_id = saved
+            super().save(*args, **kwargs)
+            if rated:
+                self.change_title_ratings(saved)
+        self._saved_score = int(self.score)
+        self._saved_title_id = self.title_id
+
+    def change_title_ratings(self, saved):
+        """Сдвигает рейтинг от сохранённых (оценка, произведение)
+        или None для новой записи к текущим.
+        """
+        score = int(self.score)
+        if saved is None:
+            Title.change_rating(self.title_id, score, 1)
+            return
+        saved_score, saved_title_id = saved
+        if saved_title_id != self.title_id:
+            Title.change_rating(saved_title_id, -saved_score, -1)
+            Title.change_rating(self.title_id, score, 1)
+        elif saved_score != score:
+            Title.change_rating(self.title_id, score - saved_score)
+
     def __str__(self):
         return self.text[:MAX_FIELD_LENGHT_STR]
 
@@ -225,11 +358,65 @@ class Comment(models.Model):
         verbose_name='Автор'
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
 
     def __str__(self):
         return self.text[:MAX_FIELD_LENGHT_STR]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+    Запрос только добавляет строку, отправляет run_mail_worker.
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Не отправлено'
+
+    subject = models.CharField('Тема', max_length=MAX_EMAIL_SUBJECT_LENGTH)
+    body = models.TextField('Текст')
+    from_email = models.CharField(
+        'Отправитель', max_length=MAX_EMAIL_FIELD_LENGHT
+    )
+    to = models.TextField('Получатели через запятую')
+    status = models.CharField(
+        'Статус',
+        max_length=MAX_STATUS_FIELD_LENGTH,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    lease = models.CharField(
+        'Захвачено воркером', max_length=MAX_LEASE_FIELD_LENGTH, blank=True
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outgoingemail_queue_idx'
+            )
+        ]
+
+    def __str__(self):
+        return self.subject[:MAX_FIELD_LENGHT_STR]
@@ -0,0 +1,116 @@
+"""Полнотекстовый поиск по произведениям, отзывам и комментариям.
+
+На SQLite для каждой модели создаётся FTS5-таблица с внешним содержимым
+(content=<таблица модели>), которую синхронизируют триггеры. На других
+СУБД поиск сводится к icontains по тем же полям.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+
+from .models import Comment, Review, Title
+
+SEARCH_FIELDS = {
+    Title: ('name', 'description'),
+    Review: ('text',),
+    Comment: ('text',),
+}
+SEARCH_TOKENIZER = 'unicode61 remove_diacritics 2'
+
+
+def get_search_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def is_search_index_supported(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def get_install_statements(model):
+    table = model._meta.db_table
+    fts = get_search_table(model)
+    columns = ', '.join(SEARCH_FIELDS[model])
+    new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS[model])
+    old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS[model])
+    insert = (f'INSERT INTO {fts}(rowid, {columns}) '
+              f'VALUES (new.id, {new_values});')
+    delete = (f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+              f"VALUES ('delete', old.id, {old_values});")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='id', "
+        f"tokenize='{SEARCH_TOKENIZER}')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} '
+        f'ON {table} BEGIN {delete} {insert} END',
+    ]
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS):
+    """Создаёт недостающие FTS-таблицы и триггеры.
+    Триггеры пропадают, когда SQLite пересоздаёт таблицу модели
+    в миграции, поэтому функция вызывается после каждого migrate.
+    Новые FTS-таблицы сразу заполняются.
+    """
+    if not is_search_index_supported(using):
+        return
+    connection = connections[using]
+    existing = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        for model in SEARCH_FIELDS:
+            for statement in get_install_statements(model):
+                cursor.execute(statement)
+            if get_search_table(model) not in existing:
+                rebuild_search_table(model, cursor)
+
+
+def rebuild_search_table(model, cursor):
+    fts = get_search_table(model)
+    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """Полностью перестраивает поисковый индекс по данным моделей."""
+    install_search_index(using)
+    with connections[using].cursor() as cursor:
+        for model in SEARCH_FIELDS:
+            rebuild_search_table(model, cursor)
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в безопасный запрос FTS5:
+    каждое слово берётся в кавычки, слова объединяются через AND.
+    """
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def search_queryset(queryset, text):
+    """Оставляет в queryset записи, подходящие под запрос,
+    и сортирует их по релевантности (bm25).
+    """
+    model = queryset.model
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_search_index_supported(queryset.db):
+        for word in re.findall(r'\w+', text):
+            condition = Q()
+            for field in SEARCH_FIELDS[model]:
+                condition |= Q(**{f'{field}__icontains': word})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    fts = get_search_table(model)
+    table = model._meta.db_table
+    # Соединение с FTS-таблицей вычисляет MATCH один раз на запрос,
+    # а rank — только для найденных строк.
+    return queryset.extra(
+        select={'search_rank': f'{fts}.rank'},
+        tables=[fts],
+        where=[f'{fts}.rowid = "{table}"."id"', f'{fts} MATCH %s'],
+        params=[match],
+    ).order_by('search_rank', 'pk')
@@ -0,0 +1,75 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Genre, GenreTitle, Review, Title
+from .search import install_search_index
+
+
+@receiver(post_delete, sender=Review)
+def decrease_title_rating(sender, instance, **kwargs):
+    """Вычитает удалённый отзыв из счётчиков рейтинга произведения.
+    Сигнал срабатывает и при каскадном удалении, внутри его транзакции.
+    """
+    Title.change_rating(instance.title_id, -int(instance.score), -1)
+
+
+def touch_titles(titles):
+    Title.objects.filter(pk__in=titles).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_renamed_titles(sender, instance, created, **kwargs):
+    """Название категории и жанров выводится в ответе произведения,
+    поэтому их изменение меняет и updated_at произведений.
+    """
+    if not created:
+        touch_titles(instance.titles.values('pk') if sender is Category
+                     else instance.title_set.values('pk'))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_orphaned_titles(sender, instance, **kwargs):
+    # Категория обнуляется, а связи с жанром удаляются без сигналов
+    # для произведений, поэтому они отмечаются заранее.
+    touch_renamed_titles(sender, instance, created=False)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_regenred_titles(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """Отмечает произведения при изменении связей со стороны жанра.
+    Жанры произведения API и админка меняют сразу после его save(),
+    который уже обновил updated_at.
+    """
+    if not reverse:
+        return
+    if action == 'pre_clear':
+        touch_titles(instance.title_set.values('pk'))
+    elif action in ('post_add', 'post_remove'):
+        touch_titles(pk_set)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def touch_linked_titles(sender, instance, **kwargs):
+    """Отмечает произведения при записи связи напрямую, например
+    из админки связей: m2m_changed в этом случае не срабатывает.
+    При переносе связи отмечается и прежнее произведение.
+    """
+    titles = {instance.title_id, getattr(instance, '_saved_title_id', None)}
+    titles.discard(None)
+    touch_titles(titles)
+    instance._saved_title_id = instance.title_id
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Восстанавливает FTS-таблицы и триггеры после миграций."""
+    install_search_index(using)
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_mail_queue(settings):
+    """Письма отправляются сразу, чтобы mail.outbox заполнялся
+    в момент запроса. Очередь проверяется в test_21_mail_queue.
+    """
+    settings.EMAIL_QUEUE_EAGER = True
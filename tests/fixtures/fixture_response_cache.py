@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def disable_response_cache(settings, tmp_path_factory):
+    """Тесты API проверяют запросы к базе на каждом обращении,
+    поэтому кеш ответов выключен. Он проверяется в test_23_response_cache;
+    тесты, которые его включают, получают пустой каталог кеша.
+    """
+    settings.RESPONSE_CACHE = None
+    settings.CACHES = {
+        **settings.CACHES,
+        'responses': {
+            **settings.CACHES['responses'],
+            'LOCATION': tmp_path_factory.mktemp('responses'),
+        },
+    }
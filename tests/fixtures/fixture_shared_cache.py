@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings, tmp_path_factory):
+    """Каждый тест получает пустой общий файловый кеш."""
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            **settings.CACHES['shared'],
+            'LOCATION': tmp_path_factory.mktemp('shared_cache'),
+        },
+    }
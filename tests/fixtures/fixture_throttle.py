@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def throttle_store(settings, tmp_path_factory):
+    """Каждый тест получает пустое хранилище счётчиков троттлинга."""
+    settings.THROTTLE_DB_PATH = (
+        tmp_path_factory.mktemp('throttle') / 'throttle.sqlite3'
+    )
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAPI:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, client, admin_client,
+                                       user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) is None, (
+            'Если у произведения нет отзывов, `rating` должен быть `None`.'
+        )
+
+        create_single_review(admin_client, title_id, 'Хорошо', 8)
+        response = create_single_review(user_client, title_id, 'Так', 3)
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=response.json()['id']
+        )
+        response = user_client.patch(review_url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки.'
+        )
+
+        response = moderator_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 8, (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Хорошо', 8)
+        create_single_review(user_client, title_id, 'Плохо', 2)
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=0, rating_count=0
+        )
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (10, 2)
+        assert title.rating == 5
+
+    def test_03_moved_review(self, client, admin_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        old_id, new_id = titles[0]['id'], titles[1]['id']
+        response = create_single_review(admin_client, old_id, 'Хорошо', 9)
+
+        review = Review.objects.get(pk=response.json()['id'])
+        review.title = Title.objects.get(pk=new_id)
+        review.score = 7
+        review.save()
+
+        old_title = Title.objects.get(pk=old_id)
+        new_title = Title.objects.get(pk=new_id)
+        assert (old_title.rating_sum, old_title.rating_count) == (0, 0), (
+            'Проверьте, что перенесённый отзыв вычитается из рейтинга '
+            'прежнего произведения.'
+        )
+        assert (new_title.rating_sum, new_title.rating_count) == (7, 1), (
+            'Проверьте, что перенесённый отзыв учитывается в рейтинге '
+            'нового произведения.'
+        )
+        assert self.get_rating(client, old_id) is None
+        assert self.get_rating(client, new_id) == 7
+        call_command('rebuild_ratings', '--check')
+
+    def test_04_stale_instances(self, admin_client, user_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Хорошо', 8)
+        response = create_single_review(user_client, title_id, 'Так', 4)
+
+        # Автор и модератор загрузили отзыв до изменений друг друга.
+        first = Review.objects.get(pk=response.json()['id'])
+        second = Review.objects.get(pk=response.json()['id'])
+        first.score = 10
+        first.save()
+        second.score = 2
+        second.save()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Сдвиг рейтинга должен считаться от оценки в базе, а не от '
+            'загруженной ранее.'
+        )
+
+        third = Review.objects.get(pk=response.json()['id'])
+        second.title_id = titles[1]['id']
+        second.save()
+        third.score = 5
+        third.save()
+        call_command('rebuild_ratings', '--check')
@@ -0,0 +1,150 @@
+import pytest
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    # COUNT + страница произведений с категорией + пакет жанров.
+    TITLES_LIST_QUERIES = 3
+    # Произведение с категорией + его жанры.
+    TITLE_DETAIL_QUERIES = 2
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    # Произведение + COUNT + страница отзывов с авторами.
+    REVIEWS_LIST_QUERIES = 3
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    # Отзыв + COUNT + страница комментариев с авторами.
+    COMMENTS_LIST_QUERIES = 3
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    # Поиск по username или email + INSERT пользователя + письмо в очередь.
+    SIGNUP_NEW_USER_QUERIES = 3
+    # Поиск + письмо в очередь.
+    SIGNUP_REPEAT_QUERIES = 2
+    # Только поиск.
+    SIGNUP_CONFLICT_QUERIES = 1
+
+    def create_more_titles(self, count):
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title=title, genre=genre) for genre in genres
+            )
+
+    def test_01_titles_list_query_budget(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        with django_assert_num_queries(self.TITLES_LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == 2
+
+        self.create_more_titles(10)
+        with django_assert_num_queries(self.TITLES_LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) > 2, (
+            'Количество запросов к БД на страницу списка произведений не '
+            'должно зависеть от размера страницы.'
+        )
+
+    def test_02_title_detail_query_budget(self, client, admin_client,
+                                          django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(self.TITLE_DETAIL_QUERIES):
+            response = client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+        assert len(response.json()['genre']) == 2
+
+    def test_03_reviews_list_is_scoped_to_title(
+        self, client, admin_client, admin, user_client, user,
+        moderator_client, moderator, django_assert_num_queries
+    ):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_num_queries(self.REVIEWS_LIST_QUERIES):
+            response = client.get(url)
+        data = response.json()
+        assert data['count'] == len(reviews)
+        assert {review['title'] for review in data['results']} == {
+            titles[0]['name']
+        }
+
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        )
+        assert response.json()['count'] == 0, (
+            'Список отзывов должен содержать только отзывы на '
+            'запрошенное произведение.'
+        )
+
+    def test_04_comments_list_is_scoped_to_review(
+        self, client, admin_client, admin, user_client, user,
+        django_assert_num_queries
+    ):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        with django_assert_num_queries(self.COMMENTS_LIST_QUERIES):
+            response = client.get(url)
+        assert response.json()['count'] == len(comments)
+
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[1]['id']
+        ))
+        assert response.json()['count'] == 0, (
+            'Список комментариев должен содержать только комментарии к '
+            'запрошенному отзыву.'
+        )
+
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        ))
+        assert response.status_code == 404, (
+            'Запрос комментариев к отзыву через чужое произведение должен '
+            'возвращать ответ со статусом 404.'
+        )
+
+    def test_05_signup_query_budget(self, client, django_assert_num_queries,
+                                    settings):
+        from django.core.cache import cache
+
+        cache.clear()
+        settings.EMAIL_QUEUE_EAGER = False
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        with django_assert_num_queries(self.SIGNUP_NEW_USER_QUERIES):
+            response = client.post(self.SIGNUP_URL, data)
+        assert response.status_code == 200
+
+        with django_assert_num_queries(self.SIGNUP_REPEAT_QUERIES):
+            response = client.post(self.SIGNUP_URL, data)
+        assert response.status_code == 200, (
+            'Повторная регистрация с теми же данными должна выдавать '
+            'новый код.'
+        )
+
+        for conflict in (
+            {'username': 'new_user', 'email': 'other@yamdb.fake'},
+            {'username': 'other_user', 'email': 'new_user@yamdb.fake'},
+        ):
+            with django_assert_num_queries(self.SIGNUP_CONFLICT_QUERIES):
+                response = client.post(self.SIGNUP_URL, conflict)
+            assert response.status_code == 400
@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEWS_COUNT = 12
+
+    def create_reviews(self, django_user_model, title_id):
+        from reviews.models import Review
+
+        for idx in range(self.REVIEWS_COUNT):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title_id=title_id, author=author, text=f'Отзыв {idx}',
+                score=idx % 10 + 1
+            )
+        return list(
+            Review.objects.filter(title_id=title_id).order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', flat=True)
+        )
+
+    def test_01_walk_reviews_with_cursor(self, client, admin_client,
+                                         django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        expected = self.create_reviews(django_user_model, titles[0]['id'])
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'В режиме курсорной пагинации ответ не должен содержать `count`.'
+        )
+        assert data['previous'] is None
+
+        pages = []
+        while True:
+            pages.append([review['id'] for review in data['results']])
+            if data['next'] is None:
+                break
+            data = client.get(data['next']).json()
+        assert sum(pages, []) == expected, (
+            'Курсорная пагинация должна возвращать все отзывы ровно один раз '
+            'в порядке от новых к старым.'
+        )
+
+        for page in reversed(pages[:-1]):
+            data = client.get(data['previous']).json()
+            assert [review['id'] for review in data['results']] == page
+        assert data['previous'] is None
+
+    def test_02_page_number_pagination_is_default(self, client,
+                                                  admin_client,
+                                                  django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        self.create_reviews(django_user_model, titles[0]['id'])
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        data = client.get(url, {'page': 2}).json()
+        assert data['count'] == self.REVIEWS_COUNT
+
+        response = client.get(url, {'cursor': 'не-курсор'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10OptionalCountPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_COUNT = 7
+
+    def create_titles(self):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000)
+            for idx in range(self.TITLES_COUNT)
+        )
+
+    def test_01_titles_without_count(self, client,
+                                     django_assert_num_queries):
+        self.create_titles()
+        with django_assert_num_queries(2):
+            data = client.get(self.TITLES_URL, {'count': 'none'}).json()
+        assert data['count'] is None
+        assert len(data['results']) == 5
+        assert data['previous'] is None
+
+        data = client.get(data['next']).json()
+        assert len(data['results']) == self.TITLES_COUNT - 5
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+    def test_02_titles_cached_count(self, client, settings):
+        from django.core.cache import caches
+
+        caches[settings.PAGINATION_COUNT_CACHE].clear()
+        self.create_titles()
+        data = client.get(self.TITLES_URL, {'count': 'cached'}).json()
+        assert data['count'] == self.TITLES_COUNT
+        assert data['next'] is not None
+
+    def test_03_page_size_is_capped(self, client, settings):
+        settings.PAGINATION_MAX_PAGE_SIZE = 6
+        self.create_titles()
+        data = client.get(self.TITLES_URL, {'page_size': 1000}).json()
+        assert data['count'] == self.TITLES_COUNT
+        assert len(data['results']) == 6
@@ -0,0 +1,49 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_slug_list_filters(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        all_names = sorted(title['name'] for title in titles)
+
+        assert self.get_names(
+            client, {'genre': f'{genres[0]["slug"]},{genres[1]["slug"]}'}
+        ) == [titles[0]['name']], (
+            'Фильтр по нескольким жанрам не должен дублировать произведения.'
+        )
+        assert self.get_names(
+            client, {'genre': f'{genres[0]["slug"]},{genres[2]["slug"]}'}
+        ) == all_names
+        assert self.get_names(
+            client, {'category': categories[1]['slug']}
+        ) == [titles[1]['name']]
+        assert self.get_names(
+            client,
+            {'category': f'{categories[0]["slug"]},{categories[1]["slug"]}'}
+        ) == all_names
+        assert self.get_names(client, {'genre': genres[0]['slug'][:3]}) == []
+
+    def test_02_year_and_name_prefix_filters(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        assert self.get_names(client, {'year': 1984}) == [titles[0]['name']]
+        assert self.get_names(client, {'year': 198}) == []
+        assert self.get_names(
+            client, {'year_min': 1985, 'year_max': 2000}
+        ) == [titles[1]['name']]
+        assert self.get_names(
+            client, {'name_prefix': titles[1]['name'][:4]}
+        ) == [titles[1]['name']]
+        assert self.get_names(
+            client, {'name_prefix': titles[1]['name'][1:]}
+        ) == []
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Search:
+
+    SEARCH_URL = '/api/v1/search/'
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_search_endpoint(self, client, admin_client, admin,
+                                user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        response = client.get(self.SEARCH_URL, {'q': 'back'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['titles']] == [
+            titles[0]['id']
+        ], 'Поиск должен находить произведения по описанию.'
+
+        data = client.get(self.SEARCH_URL, {'q': 'review number 2'}).json()
+        assert [review['id'] for review in data['reviews']][0] == (
+            reviews[1]['id']
+        ), 'Самым релевантным должен быть отзыв с совпадением всех слов.'
+        assert data['reviews'][0]['title_id'] == titles[0]['id']
+
+        data = client.get(self.SEARCH_URL, {'q': 'comment'}).json()
+        assert {comment['id'] for comment in data['comments']} == {
+            comment['id'] for comment in comments
+        }
+        assert data['comments'][0]['review_id'] == reviews[0]['id']
+
+        response = client.get(self.SEARCH_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_search_param_and_index_sync(self, client, admin_client,
+                                            user):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        data = client.get(self.TITLES_URL, {'search': 'орешек'}).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ]
+
+        Title.objects.filter(pk=titles[1]['id']).update(name='Гравитация')
+        data = client.get(self.TITLES_URL, {'search': 'орешек'}).json()
+        assert data['results'] == [], (
+            'Поисковый индекс должен обновляться при изменении записи.'
+        )
+
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=user,
+            text='Шедевр на все времена', score=10
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        data = client.get(url, {'search': 'шедевр'}).json()
+        assert [item['id'] for item in data['results']] == [review.id]
+
+        review.delete()
+        data = client.get(url, {'search': 'шедевр'}).json()
+        assert data['results'] == []
+
+        call_command('rebuild_search_index')
+        data = client.get(self.TITLES_URL, {'search': 'терминатор'}).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ]
+
+    def test_03_match_is_evaluated_once(self, client, admin_client, admin,
+                                        user_client, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(self.SEARCH_URL, {'q': 'comment'})
+        assert response.status_code == HTTPStatus.OK
+        searches = [
+            query['sql'] for query in captured if 'MATCH' in query['sql']
+        ]
+        assert len(searches) == 3
+        for sql in searches:
+            assert sql.count('MATCH') == 1, (
+                'Ранжирование должно соединяться с FTS-таблицей, а не '
+                'выполнять MATCH в подзапросе для каждой строки.'
+            )
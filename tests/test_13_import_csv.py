@@ -0,0 +1,32 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCsv:
+
+    def test_01_import_bundled_data(self):
+        from reviews.models import Comment, GenreTitle, Review, Title, User
+
+        out = StringIO()
+        call_command('import_csv', batch_size=10, stdout=out)
+        assert 'строк/с' in out.getvalue()
+        assert User.objects.filter(pk=100, username='bingobongo').exists()
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Comment.objects.count() == 3
+
+        review = Review.objects.get(pk=1)
+        assert (review.author_id, review.title_id, review.score) == (
+            100, 1, 10
+        )
+        assert review.pub_date.year == 2019, (
+            'Дата публикации должна браться из файла.'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count()
+
+        call_command('import_csv', ignore_conflicts=True, stdout=StringIO())
+        assert Review.objects.count() == 72
@@ -0,0 +1,79 @@
+from io import StringIO
+
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14GenerateData:
+
+    def generate(self):
+        from reviews.models import Review
+
+        call_command(
+            'generate_data', users=30, titles=20, genres=4, categories=2,
+            reviews=150, comments=300, batch_size=40, seed=7,
+            stdout=StringIO()
+        )
+        return list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score', 'pub_date'
+        ))
+
+    def test_01_generated_data_is_consistent(self):
+        from reviews.models import Comment, Title, User
+
+        reviews = self.generate()
+        assert User.objects.count() == 30
+        assert Title.objects.count() == 20
+        assert 100 < len(reviews) <= 150
+        assert Comment.objects.exists()
+        counts = sorted(
+            Counter(row[0] for row in reviews).values(), reverse=True
+        )
+        assert counts[0] > 3 * counts[len(counts) // 2], (
+            'Популярность произведений должна быть неравномерной.'
+        )
+        for title in Title.objects.all():
+            assert title.rating_count == title.reviews.count()
+
+    def test_02_generated_data_is_reproducible(self):
+        from reviews.models import Category, Genre, Title, User
+
+        first = self.generate()
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        second = self.generate()
+        assert [row[2:] for row in first] == [row[2:] for row in second], (
+            'При одинаковом seed данные должны совпадать.'
+        )
+
+    def test_03_sequences_reset(self, monkeypatch):
+        from django.db import connection
+
+        from reviews.models import (
+            Category,
+            Comment,
+            Genre,
+            Review,
+            Title,
+            User
+        )
+
+        reset_models = []
+        sequence_reset_sql = connection.ops.sequence_reset_sql
+
+        def record(style, models):
+            reset_models.extend(models)
+            return sequence_reset_sql(style, models)
+
+        monkeypatch.setattr(connection.ops, 'sequence_reset_sql', record)
+        self.generate()
+        assert {User, Category, Genre, Title, Review, Comment} <= set(
+            reset_models
+        ), 'После вставки с явными id счётчики ключей нужно сдвинуть.'
+        # Новые записи без явного id не должны конфликтовать
+        # со сгенерированными.
+        Category.objects.create(name='Новая', slug='new-category')
+        User.objects.create(username='new-user', email='new@yamdb.fake')
@@ -0,0 +1,66 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ReplayLoad:
+
+    def write_jsonl(self, path):
+        lines = [
+            {'method': 'GET', 'path': '/api/v1/categories/'},
+            {'method': 'get', 'url': 'http://example.com/api/v1/titles/?year=1'},
+            {'method': 'POST', 'path': '/api/v1/categories/',
+             'body': {'name': 'Нет прав', 'slug': 'no-rights'}},
+            {'request_id': 'user-001', 'title': 'Не запрос'},
+        ]
+        path.write_text(
+            '\n'.join(json.dumps(line) for line in lines), encoding='utf-8'
+        )
+
+    @pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+    def test_01_replay_reports_endpoints(self, live_server, tmp_path, mode):
+        cache.clear()
+        jsonl = tmp_path / 'requests.jsonl'
+        output = tmp_path / 'report.json'
+        self.write_jsonl(jsonl)
+        stdout = StringIO()
+        call_command(
+            'replay_load', base_url=live_server.url, jsonl=[jsonl],
+            mode=mode, concurrency=3, requests=12, output=str(output),
+            stdout=stdout
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert 'пропущено строк без method и path: 1' in stdout.getvalue()
+        assert report['requests'] == 12
+        assert report['error_rate'] == 0, (
+            'Ответы 4xx не должны считаться ошибками сервера.'
+        )
+        endpoints = report['endpoints']
+        assert set(endpoints) == {
+            'GET api:categories-list', 'GET api:title-list',
+            'POST api:categories-list'
+        }, 'Статистика должна группироваться по маршрутам Django.'
+        assert endpoints['GET api:categories-list']['statuses'] == {'200': 4}
+        assert endpoints['POST api:categories-list']['statuses'] == {'401': 4}
+        stats = endpoints['GET api:title-list']
+        assert sum(stats['histogram_ms'].values()) == stats['requests']
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+
+    def test_02_postman_collection_is_loaded(self):
+        from api.loadtest import load_postman
+
+        requests = load_postman(
+            'postman_collection/Ymdb-collection.postman_collection.json',
+            {'adminToken': 'secret'}
+        )
+        assert len(requests) > 100
+        assert all(request.path.startswith('/api/v1/')
+                   for request in requests)
+        assert any(request.headers.get('Authorization') == 'Bearer secret'
+                   for request in requests), (
+            'Переменные Postman должны подставляться в заголовки.'
+        )
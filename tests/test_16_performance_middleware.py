@@ -0,0 +1,61 @@
+import json
+import logging
+
+import pytest
+
+from tests.utils import create_titles
+
+MIDDLEWARE = 'api.middleware.PerformanceMiddleware'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16PerformanceMiddleware:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def enable_middleware(self, settings):
+        settings.MIDDLEWARE = [MIDDLEWARE] + settings.MIDDLEWARE
+
+    def test_01_server_timing_and_log(self, client, admin_client, caplog):
+        create_titles(admin_client)
+        with caplog.at_level(logging.INFO, logger='api.performance'):
+            response = client.get(self.TITLES_URL)
+        timing = response.headers.get('Server-Timing', '')
+        for metric in ('total;dur=', 'db;dur=', 'serializer;dur='):
+            assert metric in timing, (
+                f'Заголовок Server-Timing должен содержать {metric}'
+            )
+        assert '3 queries, 0 duplicates' in timing
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == self.TITLES_URL
+        assert record['status'] == 200
+        assert record['queries'] == 3
+        assert record['response_bytes'] == len(response.content)
+        assert record['serializer_ms'] > 0
+
+    def test_02_query_budget_warning(self, client, admin_client, caplog,
+                                     settings):
+        titles, _, _ = create_titles(admin_client)
+        settings.PERFORMANCE_QUERY_BUDGET = 1
+        with caplog.at_level(logging.INFO, logger='api.performance'):
+            client.get(self.TITLES_URL)
+        warnings = [record for record in caplog.records
+                    if record.levelno == logging.WARNING]
+        assert len(warnings) == 1, (
+            'Превышение бюджета запросов должно логироваться предупреждением.'
+        )
+        message = warnings[0].getMessage()
+        assert 'FROM "reviews_title"' in message
+        assert str(titles[0]['id']) not in message.split('\n', 1)[1], (
+            'В предупреждении должны быть слепки SQL без параметров.'
+        )
+
+    def test_03_fingerprint(self):
+        from api.middleware import fingerprint
+
+        assert fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s) AND  name = \'x\''
+        ) == fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s) AND name = \'y\''
+        ) == 'SELECT * FROM t WHERE id IN (...) AND name = ?'
@@ -0,0 +1,116 @@
+import json
+import re
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+
+    METRICS_URL = '/metrics'
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def metrics_dir(self, settings, tmp_path):
+        from api import metrics
+
+        settings.METRICS_DIR = tmp_path
+        metrics.store.reset()
+        return tmp_path
+
+    def get_value(self, text, line_start):
+        for line in text.splitlines():
+            if line.startswith(line_start):
+                return float(line.rsplit(' ', 1)[1])
+        return None
+
+    def test_01_requests_by_route_and_action(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert '# TYPE yamdb_http_requests_total counter' in text
+        assert self.get_value(
+            text, 'yamdb_http_requests_total{action="list",method="GET",'
+                  'route="title-list",status="200"}'
+        ) == 2, 'Запросы должны считаться по маршруту и действию viewset.'
+        assert self.get_value(
+            text, 'yamdb_http_request_duration_seconds_count'
+                  '{action="retrieve",route="title-detail"}'
+        ) == 1
+        assert self.get_value(
+            text, 'yamdb_http_request_duration_seconds_bucket'
+                  '{action="list",route="title-list",le="+Inf"}'
+        ) == 2
+        assert self.get_value(
+            text, 'yamdb_db_queries_total{action="list",route="title-list"}'
+        ) == 6
+
+    def test_02_histogram_buckets_are_cumulative(self, client):
+        client.get(self.TITLES_URL)
+        text = client.get(self.METRICS_URL).content.decode()
+        buckets = [
+            float(value) for value in re.findall(
+                r'yamdb_http_request_duration_seconds_bucket\{action="list",'
+                r'route="title-list",le="[^"]+"\} (\S+)', text
+            )
+        ]
+        assert len(buckets) == 12
+        assert buckets == sorted(buckets)
+
+    def test_03_metrics_are_summed_across_processes(self, client,
+                                                    metrics_dir):
+        client.get(self.TITLES_URL)
+        (metrics_dir / '1-1.json').write_text(json.dumps({
+            'counters': [[
+                'yamdb_http_requests_total',
+                [['action', 'list'], ['method', 'GET'],
+                 ['route', 'title-list'], ['status', '200']],
+                5
+            ]],
+            'histograms': [],
+        }))
+        text = client.get(self.METRICS_URL).content.decode()
+        assert self.get_value(
+            text, 'yamdb_http_requests_total{action="list",method="GET",'
+                  'route="title-list",status="200"}'
+        ) == 6, 'Метрики других процессов должны суммироваться.'
+
+    def test_04_cache_hits(self, client, settings):
+        from django.core.cache import caches
+
+        caches[settings.PAGINATION_COUNT_CACHE].clear()
+        settings.PAGINATION_COUNT_MODE = 'cached'
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        text = client.get(self.METRICS_URL).content.decode()
+        for result in ('hit', 'miss'):
+            assert self.get_value(
+                text, 'yamdb_cache_requests_total{cache="pagination_count",'
+                      f'result="{result}"}}'
+            ) == 1
+
+    def test_05_sql_text_is_not_kept(self, client, monkeypatch):
+        from api import middleware
+
+        def fail(*args, **kwargs):
+            raise AssertionError(
+                'MetricsMiddleware не должен сохранять текст SQL.'
+            )
+
+        monkeypatch.setattr(middleware.RequestMetrics, '__init__', fail)
+        client.get(self.TITLES_URL)
+        text = client.get(self.METRICS_URL).content.decode()
+        assert self.get_value(
+            text, 'yamdb_db_queries_total{action="list",route="title-list"}'
+        ) > 0
+        assert self.get_value(
+            text, 'yamdb_db_query_duration_seconds_total'
+                  '{action="list",route="title-list"}'
+        ) > 0
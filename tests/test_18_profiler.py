@@ -0,0 +1,62 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Profiler:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def profiler_dir(self, settings, tmp_path):
+        settings.PROFILER_DIR = tmp_path
+        return tmp_path
+
+    def test_01_admin_can_request_profile(self, admin_client, profiler_dir):
+        create_titles(admin_client)
+        response = admin_client.get(self.TITLES_URL, HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        assert response['X-Profile-File'].startswith('title-list/')
+        assert (profiler_dir / response['X-Profile-File']).exists()
+
+        response = admin_client.get(self.TITLES_URL, {'profile': '1'})
+        assert response.has_header('X-Profile-File')
+        assert len(list((profiler_dir / 'title-list').iterdir())) == 2
+
+    def test_02_others_cannot_request_profile(self, client, user_client,
+                                              profiler_dir):
+        for tested_client in (client, user_client):
+            response = tested_client.get(
+                self.TITLES_URL, {'profile': '1'}, HTTP_X_PROFILE='1'
+            )
+            assert not response.has_header('X-Profile-File'), (
+                'Профилировать по запросу может только администратор.'
+            )
+        assert not list(profiler_dir.iterdir())
+
+    def test_03_sampling_by_setting(self, client, settings, profiler_dir):
+        settings.PROFILER_SAMPLE_RATE = 1
+        settings.PROFILER_ROUTES = ('title-list',)
+        client.get(self.TITLES_URL)
+        client.get('/api/v1/categories/')
+        assert [path.name for path in profiler_dir.iterdir()] == [
+            'title-list'
+        ], 'Выборка должна ограничиваться PROFILER_ROUTES.'
+
+    def test_04_profile_report(self, admin_client, profiler_dir, tmp_path):
+        for _ in range(2):
+            admin_client.get(self.TITLES_URL, HTTP_X_PROFILE='1')
+        stdout = StringIO()
+        merged = tmp_path / 'merged.prof'
+        call_command(
+            'profile_report', path=profiler_dir, route=['title-list'],
+            limit=5, output=str(merged), stdout=stdout
+        )
+        output = stdout.getvalue()
+        assert 'профилей: 2' in output
+        assert 'cumulative' in output
+        assert merged.exists()
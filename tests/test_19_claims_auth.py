@@ -0,0 +1,113 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from tests.utils import create_reviews, run_in_other_worker
+
+
+def claims_client(user):
+    from api.authentication import ClaimsAccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ClaimsAuth:
+
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+    REVIEW_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{pk}/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def test_01_token_view_issues_claims(self, client, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from api.confirmation import confirmation_codes
+
+        response = client.post('/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': confirmation_codes.issue(user.username)
+        })
+        assert response.status_code == 200
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == user.role
+        assert token['username'] == user.username
+        assert token['is_staff'] is False
+        assert token['is_superuser'] is False
+        assert 'iat' in token
+
+    def test_02_no_user_query(self, admin, django_assert_num_queries):
+        admin_client = claims_client(admin)
+        # COUNT + страница пользователей, без загрузки администратора.
+        with django_assert_num_queries(2):
+            response = admin_client.get(self.USERS_URL)
+        assert response.status_code == 200
+        response = admin_client.get(self.ME_URL)
+        assert response.json()['username'] == admin.username
+
+    def test_03_role_change_revokes_claims(self, admin):
+        admin_client = claims_client(admin)
+        assert admin_client.get(self.USERS_URL).status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert admin_client.get(self.USERS_URL).status_code == 403, (
+            'После смены роли права должны проверяться по базе.'
+        )
+        admin.is_active = False
+        admin.save()
+        assert admin_client.get(self.USERS_URL).status_code == 401
+
+    def test_04_deleted_user_is_rejected(self, admin, user):
+        user_client = claims_client(user)
+        assert user_client.get(self.ME_URL).status_code == 200
+        user.delete()
+        assert user_client.get(self.ME_URL).status_code == 401
+
+    def test_05_unrelated_save_keeps_claims(self, admin,
+                                            django_assert_num_queries):
+        from django.contrib.auth import get_user_model
+
+        admin_client = claims_client(admin)
+        admin = get_user_model().objects.get(pk=admin.pk)
+        admin.bio = 'новая биография'
+        admin.save()
+        with django_assert_num_queries(2):
+            admin_client.get(self.USERS_URL)
+
+    def test_06_author_and_moderator_permissions(self, admin_client, user,
+                                                 moderator):
+        user_client = claims_client(user)
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], pk=reviews[0]['id']
+        )
+        response = user_client.patch(url, {'text': 'исправлено'})
+        assert response.status_code == 200
+        assert response.json()['author'] == user.username
+        response = claims_client(moderator).delete(url)
+        assert response.status_code == 204
+
+    def test_07_revocation_is_shared_between_workers(self, admin,
+                                                     settings):
+        from django.contrib.auth import get_user_model
+
+        admin_client = claims_client(admin)
+        assert admin_client.get(self.USERS_URL).status_code == 200
+        # Роль меняет другой воркер: отдельный процесс с тем же кешем.
+        get_user_model().objects.filter(pk=admin.pk).update(role='user')
+        run_in_other_worker(
+            settings,
+            'from api.authentication import mark_claims_changed\n'
+            'mark_claims_changed(int(sys.argv[2]))',
+            admin.pk
+        )
+        assert admin_client.get(self.USERS_URL).status_code == 403, (
+            'Смена роли в другом воркере должна отзывать claims токена.'
+        )
@@ -0,0 +1,89 @@
+import re
+import time
+
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import run_in_other_worker
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    USERNAME = 'code_user'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def signup(self, client):
+        client.post(self.URL_SIGNUP, {
+            'username': self.USERNAME, 'email': 'code_user@yamdb.fake'
+        })
+        return re.search(r'\d+$', mail.outbox[-1].body).group()
+
+    def get_token(self, client, code):
+        return client.post(self.URL_TOKEN, {
+            'username': self.USERNAME, 'confirmation_code': code
+        })
+
+    def test_01_token_from_another_client(self, client):
+        with CaptureQueriesContext(connection) as captured:
+            code = self.signup(client)
+            response = self.get_token(APIClient(), code)
+        assert response.status_code == 200, (
+            'Токен должен выдаваться без привязки к сессии регистрации.'
+        )
+        assert not [query for query in captured
+                    if 'django_session' in query['sql']], (
+            'Регистрация и получение токена не должны писать в сессии.'
+        )
+
+    def test_02_code_is_single_use(self, client):
+        code = self.signup(client)
+        assert self.get_token(client, code).status_code == 200
+        assert self.get_token(client, code).status_code == 400
+
+    def test_03_attempts_are_limited(self, client, settings):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 3
+        code = self.signup(client)
+        wrong = '000000' if code != '000000' else '111111'
+        for _ in range(3):
+            assert self.get_token(client, wrong).status_code == 400
+        assert self.get_token(client, code).status_code == 400, (
+            'После исчерпания попыток код должен перестать действовать.'
+        )
+        assert self.get_token(client, self.signup(client)).status_code == 200
+
+    def test_04_code_expires(self, client, settings):
+        settings.CONFIRMATION_CODE_TIMEOUT = 1
+        code = self.signup(client)
+        time.sleep(1.1)
+        assert self.get_token(client, code).status_code == 400
+
+    def test_05_new_code_replaces_old(self, client):
+        old_code = self.signup(client)
+        new_code = self.signup(client)
+        if old_code != new_code:
+            assert self.get_token(client, old_code).status_code == 400
+        assert self.get_token(client, new_code).status_code == 200
+
+    def test_06_code_from_another_worker(self, client, settings):
+        self.signup(client)
+        # Повторная регистрация попала в другой воркер.
+        code = run_in_other_worker(
+            settings,
+            'from api.confirmation import confirmation_codes\n'
+            'print(confirmation_codes.issue(sys.argv[2]))',
+            self.USERNAME
+        ).strip()
+        response = self.get_token(APIClient(), code)
+        assert response.status_code == 200, (
+            'Код, выданный одним воркером, должен приниматься другим.'
+        )
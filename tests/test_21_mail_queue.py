@@ -0,0 +1,144 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FailingEmailBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21MailQueue:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def queue_mail(self, settings):
+        cache.clear()
+        settings.EMAIL_QUEUE_EAGER = False
+
+    def signup(self, client, number):
+        response = client.post(self.URL_SIGNUP, {
+            'username': f'mail_user{number}',
+            'email': f'mail_user{number}@yamdb.fake'
+        })
+        assert response.status_code == 200
+
+    def run_worker(self, **options):
+        call_command('run_mail_worker', once=True, stdout=StringIO(),
+                     **options)
+
+    def test_01_signup_only_enqueues(self, client):
+        from reviews.models import OutgoingEmail
+
+        self.signup(client, 1)
+        assert not mail.outbox, 'Регистрация не должна отправлять письмо.'
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.StatusChoices.PENDING
+        assert email.to == 'mail_user1@yamdb.fake'
+
+        self.run_worker()
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['mail_user1@yamdb.fake']
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.StatusChoices.SENT
+        assert email.sent_at is not None
+
+    def test_02_batches_share_connection(self, client, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_21_mail_queue.CountingEmailBackend'
+        )
+        CountingEmailBackend.opened = 0
+        for number in range(5):
+            self.signup(client, number)
+        self.run_worker(batch_size=2)
+        assert len(mail.outbox) == 5
+        assert CountingEmailBackend.opened == 1, (
+            'Воркер должен отправлять пачки через одно соединение.'
+        )
+
+    def test_03_retry_with_backoff(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_21_mail_queue.FailingEmailBackend'
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        self.signup(client, 1)
+        self.run_worker()
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.StatusChoices.PENDING
+        assert email.attempts == 1
+        assert 'SMTP недоступен' in email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Неудачное письмо должно откладываться.'
+        )
+
+        self.run_worker()
+        email.refresh_from_db()
+        assert email.attempts == 1, 'Отложенное письмо не должно отправляться.'
+
+        OutgoingEmail.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.run_worker()
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.status == OutgoingEmail.StatusChoices.FAILED
+
+    def test_04_claimed_emails_are_skipped(self, client):
+        from api.mail_queue import claim_batch
+
+        self.signup(client, 1)
+        self.signup(client, 2)
+        assert len(claim_batch(1)) == 1
+        assert len(claim_batch(10)) == 1, (
+            'Захваченное письмо не должно достаться другому воркеру.'
+        )
+        assert claim_batch(10) == []
+
+    def test_05_threads(self, client):
+        for number in range(6):
+            self.signup(client, number)
+        self.run_worker(threads=3, batch_size=1)
+        assert len(mail.outbox) == 6
+
+    def test_06_codes_are_not_kept(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_RETENTION = 60
+        self.signup(client, 1)
+        self.signup(client, 2)
+        self.run_worker()
+        assert len(mail.outbox) == 2
+        assert not OutgoingEmail.objects.exclude(body=''), (
+            'После отправки текст письма с кодом должен стираться.'
+        )
+
+        OutgoingEmail.objects.filter(to='mail_user1@yamdb.fake').update(
+            created_at=timezone.now() - timedelta(seconds=120)
+        )
+        self.signup(client, 3)
+        OutgoingEmail.objects.filter(to='mail_user3@yamdb.fake').update(
+            created_at=timezone.now() - timedelta(seconds=120),
+            next_attempt_at=timezone.now() + timedelta(seconds=60)
+        )
+        self.run_worker()
+        assert set(OutgoingEmail.objects.values_list('to', flat=True)) == {
+            'mail_user2@yamdb.fake', 'mail_user3@yamdb.fake'
+        }, 'Удаляются только старые обработанные письма.'
+        assert OutgoingEmail.objects.get(to='mail_user3@yamdb.fake').body
@@ -0,0 +1,98 @@
+import multiprocessing
+
+import pytest
+
+
+def hit_in_child(path, times):
+    from django.conf import settings
+
+    from api.throttling import store
+
+    settings.THROTTLE_DB_PATH = path
+    for _ in range(times):
+        store.hit('shared', 100, 3600, now=10)
+
+
+class Test22SlidingWindowStore:
+
+    @pytest.fixture
+    def store(self, settings):
+        from api.throttling import store
+
+        return store
+
+    def test_01_limit_within_window(self, store):
+        results = [store.hit('key', 3, 100, now=10)[0] for _ in range(5)]
+        assert results == [True, True, True, False, False]
+        allowed, wait = store.hit('key', 3, 100, now=20)
+        assert not allowed
+        assert 0 < wait <= 180
+
+    def test_02_previous_window_is_weighted(self, store):
+        for _ in range(10):
+            assert store.hit('key', 10, 100, now=50)[0]
+        # Четверть предыдущего окна ещё в интервале: 10 * 0.25 = 2.5.
+        results = [store.hit('key', 10, 100, now=175)[0] for _ in range(9)]
+        assert results.count(True) == 7, (
+            'Запросы предыдущего окна должны учитываться пропорционально.'
+        )
+        assert store.hit('other', 10, 100, now=175)[0], (
+            'Счётчики разных ключей независимы.'
+        )
+        assert store.hit('key', 10, 100, now=400)[0], (
+            'Через окно без запросов счётчики должны обнуляться.'
+        )
+
+    def test_03_store_is_shared_between_processes(self, store, settings):
+        context = multiprocessing.get_context('fork')
+        process = context.Process(
+            target=hit_in_child, args=(settings.THROTTLE_DB_PATH, 5)
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert store.hit('shared', 6, 3600, now=10)[0]
+        assert not store.hit('shared', 6, 3600, now=10)[0], (
+            'Запросы других процессов должны учитываться в общем лимите.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture(autouse=True)
+    def rates(self, settings):
+        rest_framework = dict(settings.REST_FRAMEWORK)
+        rest_framework['DEFAULT_THROTTLE_RATES'] = dict(
+            rest_framework['DEFAULT_THROTTLE_RATES'], signup='2/hour',
+            token='3/hour'
+        )
+        settings.REST_FRAMEWORK = rest_framework
+
+    def test_01_signup_scope(self, client):
+        for number in range(2):
+            response = client.post(self.URL_SIGNUP, {
+                'username': f'throttled{number}',
+                'email': f'throttled{number}@yamdb.fake'
+            })
+            assert response.status_code == 200
+        response = client.post(self.URL_SIGNUP, {
+            'username': 'throttled', 'email': 'throttled@yamdb.fake'
+        })
+        assert response.status_code == 429, (
+            'Регистрация должна ограничиваться лимитом scope signup.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert client.get('/api/v1/titles/').status_code == 200, (
+            'Лимит signup не должен влиять на другие эндпоинты.'
+        )
+
+    def test_02_token_scope(self, client):
+        data = {'username': 'nobody', 'confirmation_code': '000000'}
+        statuses = [
+            client.post(self.URL_TOKEN, data).status_code for _ in range(4)
+        ]
+        assert statuses == [404, 404, 404, 429]
@@ -0,0 +1,125 @@
+import pytest
+
+from tests.utils import (
+    create_single_review,
+    create_titles,
+    run_in_other_worker
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    CATEGORIES_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+
+    @pytest.fixture(autouse=True, params=['locmem', 'filebased'])
+    def response_cache(self, request, settings, tmp_path):
+        from django.core.cache import caches
+
+        backend = {
+            'locmem': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'test-responses',
+            },
+            'filebased': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path / 'responses'),
+            },
+        }[request.param]
+        settings.CACHES = dict(settings.CACHES, responses=backend)
+        settings.RESPONSE_CACHE = 'responses'
+        caches['responses'].clear()
+        return request.param
+
+    def test_01_anonymous_list_is_cached(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        first = client.get(self.TITLES_URL)
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = client.get(self.TITLES_URL)
+        assert second.status_code == 200
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+        assert second['Content-Type'] == first['Content-Type']
+
+    def test_02_query_string_is_part_of_key(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        response = client.get(self.TITLES_URL, {'year': 1984})
+        assert response['X-Cache'] == 'MISS', (
+            'Ответы с разными параметрами запроса должны кешироваться '
+            'отдельно.'
+        )
+        assert response.json()['count'] == 1
+
+    def test_03_api_writes_invalidate(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 2
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        client.get(detail_url)
+
+        admin_client.delete(f'{self.CATEGORIES_URL}{categories[0]["slug"]}/')
+        response = client.get(self.CATEGORIES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1
+        assert client.get(detail_url).json()['category'] is None, (
+            'Изменение категории должно сбрасывать кеш произведений.'
+        )
+
+        admin_client.patch(detail_url, {'name': 'Терминатор 2'})
+        assert client.get(detail_url).json()['name'] == 'Терминатор 2'
+
+    def test_04_rating_change_invalidates(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(detail_url).json()['rating'] is None
+        create_single_review(admin_client, titles[0]['id'], 'отзыв', 7)
+        assert client.get(detail_url).json()['rating'] == 7
+
+    def test_05_model_writes_invalidate(self, client, admin_client):
+        from reviews.models import Genre
+
+        create_titles(admin_client)
+        client.get(self.GENRES_URL)
+        client.get(self.TITLES_URL)
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        assert 'Хоррор' in client.get(self.GENRES_URL).content.decode()
+        assert 'Хоррор' in client.get(self.TITLES_URL).content.decode()
+
+    def test_06_authenticated_requests_are_not_cached(self, admin_client):
+        create_titles(admin_client)
+        admin_client.get(self.TITLES_URL)
+        response = admin_client.get(self.TITLES_URL)
+        assert 'X-Cache' not in response
+
+    def test_07_write_in_other_worker_invalidates(self, client,
+                                                  admin_client, settings,
+                                                  response_cache):
+        from reviews.models import Title
+
+        if response_cache != 'filebased':
+            pytest.skip('LocMemCache не общий для процессов')
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        client.get(detail_url)
+        assert client.get(detail_url)['X-Cache'] == 'HIT'
+
+        # Запись обработал другой воркер: строка в базе изменилась,
+        # а поколение увеличил его сигнал.
+        Title.objects.filter(pk=titles[0]['id']).update(name='Терминатор 2')
+        run_in_other_worker(
+            settings,
+            'from api.response_cache import bump\n'
+            'bump(\'titles\')'
+        )
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Запись в другом воркере должна сбрасывать кеш ответов.'
+        )
+        assert response.json()['name'] == 'Терминатор 2'
@@ -0,0 +1,138 @@
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_title_detail_not_modified(self, client, admin_client,
+                                          monkeypatch):
+        from api.serializers import TitleReadSerializer
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag.startswith('"') and etag.endswith('"'), (
+            'ETag должен быть сильным.'
+        )
+        assert 'Last-Modified' in response
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Сериализатор не должен вызываться.')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(TitleReadSerializer, 'to_representation', fail)
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304
+            assert response['ETag'] == etag
+            assert not response.content
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            assert response.status_code == 304
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}'
+            ).status_code == 304
+
+        admin_client.patch(url, {'name': 'Терминатор 2'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_02_related_changes_update_title_etag(self, client,
+                                                  admin_client):
+        from reviews.models import Category, Genre, GenreTitle
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        etags = [client.get(url)['ETag']]
+        category = Category.objects.get(slug=titles[0]['category'])
+        category.name = 'Кино'
+        category.save()
+        etags.append(client.get(url)['ETag'])
+        Genre.objects.get(slug=titles[0]['genre'][0]).delete()
+        etags.append(client.get(url)['ETag'])
+        link = GenreTitle.objects.create(
+            title_id=titles[0]['id'],
+            genre=Genre.objects.create(name='Вестерн', slug='western')
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+        assert response.status_code == 200, (
+            'Связь, созданная напрямую, должна менять ETag произведения.'
+        )
+        etags.append(response['ETag'])
+        link.title_id = titles[1]['id']
+        link.save()
+        etags.append(client.get(url)['ETag'])
+        link.delete()
+        etags.append(
+            client.get(f'{self.TITLES_URL}{titles[1]["id"]}/')['ETag']
+        )
+        assert len(set(etags)) == 6, (
+            'Изменение категории и жанров должно менять ETag произведения.'
+        )
+
+    def test_03_reviews_list_etag(self, client, admin_client, user,
+                                  user_client, moderator, moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+        assert client.get(f'{url}?pagination=cursor')['ETag'] != etag, (
+            'ETag должен зависеть от параметров запроса.'
+        )
+
+        moderator_client.post(url, {'text': 'ещё отзыв', 'score': 3})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'username': 'renamed'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Смена имени автора должна менять ETag его отзывов.'
+        )
+        assert 'renamed' in response.content.decode()
+
+    def test_04_comments_list_etag(self, client, admin_client, user,
+                                   user_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        user_client.post(url, {'text': 'комментарий'})
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        comment_id = client.get(url).json()['results'][0]['id']
+        user_client.delete(f'{url}{comment_id}/')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_05_cached_response_not_modified(self, client, admin_client,
+                                             settings,
+                                             django_assert_num_queries):
+        from django.core.cache import caches
+
+        settings.RESPONSE_CACHE = 'responses'
+        caches['responses'].clear()
+        create_titles(admin_client)
+        etag = client.get(self.TITLES_URL)['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
@@ -0,0 +1,209 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache, caches
+
+from tests.utils import create_titles, run_in_other_worker
+
+
+class Test25SingleFlight:
+
+    KEY = 'single-flight-test'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def get_or_set(self, compute):
+        from api import single_flight
+
+        return single_flight.get_or_set(
+            caches['default'], self.KEY, compute, 60, 60, 'test'
+        )
+
+    def test_01_concurrent_misses_compute_once(self, settings):
+        settings.SINGLE_FLIGHT_WAIT = 5
+        calls, results = [], []
+        start = threading.Barrier(8)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 42
+
+        def worker():
+            start.wait()
+            results.append(self.get_or_set(compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, 'Пересчитывать должен один поток.'
+        assert results == [42] * 8
+
+    def test_02_stale_value_while_revalidating(self):
+        from api import single_flight
+
+        single_flight.set_entry(cache, self.KEY, 'старое', -1, 60)
+        token = single_flight.acquire(cache, self.KEY)
+        assert self.get_or_set(lambda: 'новое') == 'старое', (
+            'Пока другой процесс пересчитывает, отдаётся прежнее значение.'
+        )
+        single_flight.release(cache, self.KEY, token)
+        assert self.get_or_set(lambda: 'новое') == 'новое'
+        assert self.get_or_set(lambda: 'другое') == 'новое'
+
+    def test_03_wait_timeout_and_errors(self, settings):
+        from api import single_flight
+
+        settings.SINGLE_FLIGHT_WAIT = 0.05
+        token = single_flight.acquire(cache, self.KEY)
+        assert self.get_or_set(lambda: 1) == 1
+        assert single_flight.get_entry(cache, self.KEY) == (None, False), (
+            'Без блокировки результат не сохраняется.'
+        )
+        single_flight.release(cache, self.KEY, token)
+
+        def fail():
+            raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            self.get_or_set(fail)
+        assert single_flight.acquire(cache, self.KEY) is not None, (
+            'Блокировка должна сниматься при ошибке пересчёта.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SingleFlightResponses:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def response_cache(self, settings):
+        settings.RESPONSE_CACHE = 'responses'
+        caches['responses'].clear()
+
+    @pytest.fixture(autouse=True)
+    def metrics_dir(self, settings, tmp_path):
+        from api import metrics
+
+        settings.METRICS_DIR = tmp_path
+        metrics.store.reset()
+
+    def test_01_stale_response_served(self, client, admin_client,
+                                      monkeypatch, settings,
+                                      django_assert_num_queries):
+        from api import single_flight
+
+        create_titles(admin_client)
+        fresh = client.get(self.TITLES_URL)
+        now = time.time() + settings.RESPONSE_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(single_flight, 'time', lambda: now)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(single_flight, 'acquire', lambda cache, key: None)
+            with django_assert_num_queries(0):
+                response = client.get(self.TITLES_URL)
+            assert response['X-Cache'] == 'STALE'
+            assert response.content == fresh.content
+            patch.setattr(single_flight, 'wait', lambda cache, key: None)
+            response = client.get(f'{self.TITLES_URL}?year=1')
+            assert response.status_code == 200
+            assert 'X-Cache' not in response, (
+                'Ответ, посчитанный без блокировки, не кешируется.'
+            )
+
+        text = client.get('/metrics').content.decode()
+        assert '# TYPE yamdb_single_flight_total counter' in text
+        for result in ('stale', 'timeout'):
+            assert (
+                'yamdb_single_flight_total'
+                f'{{cache="responses",result="{result}"}} 1'
+            ) in text, (
+                f'Исход `{result}` должен попадать в /metrics.'
+            )
+
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'MISS'
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'HIT'
+
+    def test_02_write_is_not_served_stale(self, client, admin_client,
+                                          monkeypatch):
+        from api import single_flight
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        client.get(url)
+        admin_client.patch(url, {'name': 'Терминатор 2'})
+        monkeypatch.setattr(single_flight, 'acquire', lambda cache, key: None)
+        monkeypatch.setattr(single_flight, 'wait', lambda cache, key: None)
+        assert client.get(url).json()['name'] == 'Терминатор 2', (
+            'После записи устаревший ответ отдаваться не должен.'
+        )
+
+    def lock_in_other_worker(self, settings, alias, key):
+        token = run_in_other_worker(
+            settings,
+            'from django.core.cache import caches\n'
+            'from api import single_flight\n'
+            'print(single_flight.acquire(caches[sys.argv[2]], sys.argv[3]))',
+            alias, key
+        ).strip()
+        assert token != 'None', 'Другой процесс должен взять блокировку.'
+
+    def test_03_lock_is_shared_between_workers(self, client, admin_client,
+                                               monkeypatch, settings,
+                                               django_assert_num_queries):
+        from hashlib import md5
+
+        from api import single_flight
+        from api.response_cache import RESPONSE_KEY, get_generation
+
+        create_titles(admin_client)
+        fresh = client.get(self.TITLES_URL)
+        # Ответ пересчитывает другой воркер: блокировка у его процесса.
+        self.lock_in_other_worker(
+            settings, settings.RESPONSE_CACHE, RESPONSE_KEY.format(
+                'titles', get_generation('titles'),
+                md5(f'http://testserver{self.TITLES_URL}'.encode()).hexdigest()
+            )
+        )
+        now = time.time() + settings.RESPONSE_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(single_flight, 'time', lambda: now)
+        with django_assert_num_queries(0):
+            response = client.get(self.TITLES_URL)
+        assert response['X-Cache'] == 'STALE', (
+            'Пока другой воркер пересчитывает ответ, отдаётся устаревший.'
+        )
+        assert response.content == fresh.content
+
+    def test_04_count_lock_is_shared_between_workers(
+            self, client, admin_client, monkeypatch, settings):
+        from api import single_flight
+        from reviews.models import Title
+
+        settings.RESPONSE_CACHE = None
+        create_titles(admin_client)
+        url = f'{self.TITLES_URL}?count=cached'
+        assert client.get(url).json()['count'] == 2
+        Title.objects.create(name='Новое', year=2000)
+
+        # Ключ счётчика берётся из самой пагинации.
+        keys = []
+        monkeypatch.setattr(
+            single_flight, 'get_or_set',
+            lambda cache, key, *args: keys.append(key) or 0
+        )
+        client.get(url)
+        monkeypatch.undo()
+        self.lock_in_other_worker(
+            settings, settings.PAGINATION_COUNT_CACHE, keys[0]
+        )
+        now = time.time() + settings.PAGINATION_COUNT_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(single_flight, 'time', lambda: now)
+        assert client.get(url).json()['count'] == 2, (
+            'Пока другой воркер пересчитывает COUNT(*), отдаётся прежний.'
+        )
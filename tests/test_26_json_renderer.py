@@ -0,0 +1,120 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils.translation import gettext_lazy
+
+from tests.utils import create_titles
+
+MSK = timezone(timedelta(hours=3))
+PAYLOAD = {
+    'utc': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'moscow': datetime(2024, 5, 1, 15, 30, tzinfo=MSK),
+    'naive': datetime(2024, 5, 1, 12, 30),
+    'date': date(2024, 5, 1),
+    'time': time(12, 30, 15, 500),
+    'decimal': Decimal('7.25'),
+    'timedelta': timedelta(minutes=1, microseconds=5),
+    'uuid': uuid.UUID(int=1),
+    'lazy': gettext_lazy('Произведение'),
+    'text': 'Ужасы — «Терминатор»     "кавычки" \\ \n',
+    'numbers': [0, -1, 1.5, 2 ** 63 - 1, True, None],
+    'nested': [{'genre': [{'name': 'Комедия', 'slug': 'comedy'}]}],
+    1: 'целый ключ',
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def fast_renderer(request, monkeypatch):
+    from api import parsers, renderers
+
+    if request.param == 'json':
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+    elif renderers.orjson is None:
+        pytest.skip('orjson не установлен')
+    return renderers.FastJSONRenderer()
+
+
+class Test26JSONRenderer:
+
+    def render_both(self, renderer, data, media_type=None, context=None):
+        from rest_framework.renderers import JSONRenderer
+
+        return (
+            JSONRenderer().render(data, media_type, context),
+            renderer.render(data, media_type, context)
+        )
+
+    def test_01_output_matches_drf(self, fast_renderer):
+        expected, content = self.render_both(fast_renderer, PAYLOAD)
+        assert content == expected
+        assert b'"2024-05-01T12:30:15.123456Z"' in content
+        assert b'"decimal":7.25' in content
+        assert b'\\u2028' in content
+
+    def test_02_fallbacks_match_drf(self, fast_renderer):
+        for data, media_type, context in (
+            (None, None, None),
+            ({'big': 2 ** 70}, None, None),
+            (PAYLOAD, 'application/json; indent=4', None),
+            (PAYLOAD, None, {'indent': 2}),
+        ):
+            expected, content = self.render_both(
+                fast_renderer, data, media_type, context
+            )
+            assert content == expected
+
+    def test_03_parser_matches_drf(self, fast_renderer):
+        from rest_framework.exceptions import ParseError
+        from rest_framework.parsers import JSONParser
+
+        from api.parsers import FastJSONParser
+
+        for body, context in (
+            ('{"name": "Терминатор", "year": 1984, "genre": ["horror"]}'
+             .encode(), None),
+            (b'{"big": 123456789012345678901234567890}', None),
+            ('{"name": "Ужасы"}'.encode('utf-16'), {'encoding': 'utf-16'}),
+        ):
+            assert FastJSONParser().parse(
+                BytesIO(body), parser_context=context
+            ) == JSONParser().parse(BytesIO(body), parser_context=context)
+
+        for body in (b'{"name": ', b'{"score": NaN}'):
+            with pytest.raises(ParseError) as fast_error:
+                FastJSONParser().parse(BytesIO(body))
+            with pytest.raises(ParseError) as drf_error:
+                JSONParser().parse(BytesIO(body))
+            assert str(fast_error.value) == str(drf_error.value)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26JSONRendererAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_titles_page_matches_drf(self, client, admin_client,
+                                        fast_renderer):
+        from rest_framework.renderers import JSONRenderer
+
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        assert response.content == JSONRenderer().render(response.data)
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert response.content == JSONRenderer().render(response.data)
+        assert response.json()['genre'][0]['slug'] == titles[0]['genre'][0]
+
+    def test_02_json_request_body(self, admin_client, fast_renderer):
+        response = admin_client.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'},
+            format='json'
+        )
+        assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/genres/', b'{"name": ', content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert 'JSON parse error' in response.json()['detail']
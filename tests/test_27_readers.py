@@ -0,0 +1,98 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Readers:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def get_urls(self, admin_client, authors_map):
+        from reviews.models import Title
+
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        # Произведение без категории, жанров и отзывов.
+        Title.objects.create(name='Без категории', year=2000)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        return [
+            self.TITLES_URL,
+            f'{self.TITLES_URL}?page_size=2&page=2',
+            f'{self.TITLES_URL}?genre={titles[0]["genre"][0]}',
+            f'{self.TITLES_URL}?search=Терминатор',
+            f'{self.TITLES_URL}?count=none',
+            f'{self.TITLES_URL}{title_id}/',
+            reviews_url,
+            f'{reviews_url}?pagination=cursor',
+            f'{reviews_url}{review_id}/',
+            comments_url,
+            f'{comments_url}{comments[0]["id"]}/',
+        ]
+
+    def test_01_output_matches_serializers(self, client, user_client,
+                                           admin_client, user, moderator,
+                                           moderator_client, settings):
+        urls = self.get_urls(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        for url in urls:
+            responses = []
+            for compiled in (True, False):
+                settings.COMPILED_READERS = compiled
+                response = client.get(url)
+                assert response.status_code == 200, url
+                responses.append(response)
+            compiled, serialized = responses
+            assert compiled.content == serialized.content, (
+                f'Ответ `{url}` через reader должен совпадать с ответом '
+                'сериализатора байт в байт.'
+            )
+            assert compiled['ETag'] == serialized['ETag'], (
+                f'ETag `{url}` не должен зависеть от способа чтения.'
+            )
+
+    def test_02_readers_skip_serializers(self, client, user_client,
+                                         admin_client, user, monkeypatch):
+        from api.serializers import (
+            CommentSerializer,
+            ReviewSerializer,
+            TitleReadSerializer
+        )
+
+        urls = self.get_urls(admin_client, {user: user_client})
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Сериализатор не должен вызываться.')
+
+        for serializer in (CommentSerializer, ReviewSerializer,
+                           TitleReadSerializer):
+            monkeypatch.setattr(serializer, 'to_representation', fail)
+        for url in urls:
+            assert client.get(url).status_code == 200, url
+
+    def test_03_unknown_serializer_field(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from rest_framework import serializers
+
+        from api.readers import CommentReader
+        from api.serializers import CommentSerializer
+
+        class ExtendedSerializer(CommentSerializer):
+            review = serializers.IntegerField(source='review_id')
+
+            class Meta(CommentSerializer.Meta):
+                fields = CommentSerializer.Meta.fields + ('review',)
+
+        class ExtendedReader(CommentReader):
+            serializer_class = ExtendedSerializer
+
+        with pytest.raises(ImproperlyConfigured):
+            ExtendedReader.get_compiled()
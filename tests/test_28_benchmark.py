@@ -0,0 +1,100 @@
+import json
+import subprocess
+import sys
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+def route(p50_ms=10, p95_ms=20, queries=3, memory_kb=100):
+    return {'p50_ms': p50_ms, 'p95_ms': p95_ms, 'queries': queries,
+            'memory_kb': memory_kb}
+
+
+class Test28Benchmark:
+
+    def compare(self, old, new, threshold=0.2, min_delta_ms=2):
+        from api.benchmark import compare_reports
+
+        return compare_reports(
+            {'routes': {'title-list': old}}, {'routes': {'title-list': new}},
+            threshold, min_delta_ms
+        )
+
+    def test_01_compare_reports(self):
+        from api.benchmark import compare_reports
+
+        assert self.compare(route(), route()) == []
+        assert self.compare(route(), route(queries=4)) == [
+            ('title-list', 'queries', 3, 4)
+        ], 'Любой рост числа запросов — регрессия.'
+        assert self.compare(route(), route(p50_ms=11.9, p95_ms=23.9)) == [], (
+            'Рост задержки в пределах threshold — не регрессия.'
+        )
+        assert self.compare(
+            route(p50_ms=1, p95_ms=1), route(p50_ms=2.5, p95_ms=2.5)
+        ) == [], 'Рост задержки меньше min_delta_ms считается шумом.'
+        assert self.compare(route(), route(p50_ms=15)) == [
+            ('title-list', 'p50_ms', 10, 15)
+        ]
+        assert self.compare(route(), route(memory_kb=130)) == [
+            ('title-list', 'memory_kb', 100, 130)
+        ]
+        assert self.compare(
+            route(), route(memory_kb=130), threshold=0.5
+        ) == []
+        assert compare_reports(
+            {'routes': {'title-list': route(), 'search': route()}},
+            {'routes': {'title-list': route()}}, 0.2
+        ) == [], 'Маршрут, которого нет в новом отчёте, пропускается.'
+
+    def test_02_invalid_requests(self):
+        with pytest.raises(CommandError):
+            call_command('benchmark_api', requests=0)
+
+    def run_benchmark(self, settings, tmp_path, baseline):
+        baseline_path = tmp_path / 'baseline.json'
+        baseline_path.write_text(json.dumps(baseline))
+        output = tmp_path / 'report.json'
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'benchmark_api', '--users', '3',
+             '--titles', '3', '--reviews', '5', '--comments', '5',
+             '--requests', '1', '--output', str(output),
+             '--compare', str(baseline_path), '--threshold', '1000',
+             '--min-delta-ms', '100000'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True
+        )
+        return result, json.loads(output.read_text())
+
+    def test_03_command_exit_code(self, settings, tmp_path):
+        # Базовый отчёт с заведомо большими значениями: регрессий нет.
+        baseline = {'routes': {
+            name: route(10 ** 6, 10 ** 6, 10 ** 3, 10 ** 6)
+            for name in ('title-list', 'search', 'signup')
+        }}
+        result, report = self.run_benchmark(settings, tmp_path, baseline)
+        assert result.returncode == 0, result.stderr
+        assert 'Регрессий не найдено' in result.stdout
+        assert {'title-list', 'search', 'token'} <= set(report['routes'])
+
+        baseline['routes']['search']['queries'] = 0
+        result, _ = self.run_benchmark(settings, tmp_path, baseline)
+        assert result.returncode != 0, (
+            'При регрессии команда должна завершаться с ошибкой.'
+        )
+        assert 'Найдено регрессий: 1' in result.stderr
+        assert 'search: queries 0 ->' in result.stdout
+
+    def test_04_isolated_throttles(self, settings):
+        from api import throttling
+        from api.benchmark import isolated_storage
+
+        live_path = settings.THROTTLE_DB_PATH
+        throttling.store.hit('live', 10, 60, now=30)
+        with isolated_storage():
+            assert settings.THROTTLE_DB_PATH != live_path
+            throttling.store.clear()
+        assert settings.THROTTLE_DB_PATH == live_path
+        assert throttling.store.hit('live', 1, 60, now=30)[0] is False, (
+            'Сброс счётчиков в бенчмарке не должен обнулять лимиты сервера.'
+        )
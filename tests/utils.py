@@ -1,5 +1,23 @@
+import json
+import os
+import subprocess
+import sys
 from http import HTTPStatus
 
+OTHER_WORKER_PREAMBLE = '''
+import json
+import sys
+
+import django
+from django.conf import settings
+
+django.setup()
+for name, value in json.loads(sys.argv[1]).items():
+    setattr(settings, name, value)
+'''
+# Настройки теста, которые передаются в другой процесс.
+OTHER_WORKER_SETTINGS = ('CACHES', 'RESPONSE_CACHE', 'PAGINATION_COUNT_CACHE')
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +323,20 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def run_in_other_worker(settings, script, *args):
+    """Выполняет script в отдельном процессе проекта с теми же
+    кешами, что у теста, и возвращает его stdout. Аргументы доступны
+    в script как sys.argv[2:].
+    """
+    overrides = json.dumps({
+        name: getattr(settings, name) for name in OTHER_WORKER_SETTINGS
+    }, default=str)
+    result = subprocess.run(
+        [sys.executable, '-c', OTHER_WORKER_PREAMBLE + script, overrides,
+         *map(str, args)],
+        cwd=settings.BASE_DIR, check=True, capture_output=True, text=True,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'}
+    )
+    return result.stdout